@@ -4,7 +4,10 @@ from pathlib import Path
 
 import click
 
+from .integrations.sources import MATCH_YEARS
 from .pipeline.build import build_all
+from .staging.validation import ValidationError
+from .utils import SOURCE_FAMILIES, TOURS, check_compression, parse_names, parse_years
 
 
 @click.group()
@@ -16,11 +19,49 @@ def cli():
 @cli.command()
 @click.option("--data-root", type=click.Path(exists=True, file_okay=False, path_type=Path), required=True)
 @click.option("--out-dir", type=click.Path(file_okay=False, path_type=Path), required=True)
-def build(data_root: Path, out_dir: Path):
+@click.option("--strict", is_flag=True, default=False, help="Abort right after loading if source rows break a validation rule.")
+@click.option("--low-memory", is_flag=True, default=False, help="Process and append one year at a time; same output, peak memory of a single year.")
+@click.option("--compression", type=click.Choice(["none", "gzip", "zstd"]), default="none", show_default=True, help="Compress the large outputs (matches, points, shots) with multiple threads.")
+@click.option("--years", default=None, help="Only build these years, e.g. 2020-2024 or 2019,2021. Out-of-scope files are never read.")
+@click.option("--tours", default=None, help="Only build these tours: comma-separated atp,wta.")
+@click.option("--sources", default=None, help="Only build these source families: comma-separated main,qual,futures,slam,mcp.")
+def build(data_root: Path, out_dir: Path, strict: bool, low_memory: bool, compression: str, years: str, tours: str, sources: str):
 	"""Build manifests, dimensions, and master outputs."""
+	try:
+		check_compression(compression)
+	except ValueError as exc:
+		raise click.BadParameter(str(exc), param_hint="--compression")
+	try:
+		scope = dict(years=parse_years(years, MATCH_YEARS), tours=parse_names(tours, TOURS), sources=parse_names(sources, SOURCE_FAMILIES))
+	except ValueError as exc:
+		raise click.BadParameter(str(exc))
 	out_dir.mkdir(parents=True, exist_ok=True)
-	build_all(data_root=data_root, out_dir=out_dir)
-	click.echo(f"Build complete. Outputs in {out_dir}")
+	try:
+		written = build_all(data_root=data_root, out_dir=out_dir, strict_validation=strict, low_memory=low_memory, compression=compression, **scope)
+	except ValidationError as exc:
+		raise click.ClickException(str(exc))
+	click.echo(f"Build complete. Outputs in {written}")
+
+
+@cli.command()
+@click.option("--out-dir", type=click.Path(exists=True, file_okay=False, path_type=Path), required=True, help="Output directory of a build.")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8765, show_default=True)
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False, path_type=Path), default=None, help="Listen on this Unix socket instead of host/port.")
+@click.option("--poll-interval", type=float, default=2.0, show_default=True, help="Seconds between checks for a newly completed build.")
+@click.option("--matches-table", default="tennis_master_matches.csv", show_default=True, help="Matches table to serve, e.g. tennis_master_matches_futures_included.csv.")
+def serve(out_dir: Path, host: str, port: int, socket_path: Path, poll_interval: float, matches_table: str):
+	"""Serve the built tables from memory over a local HTTP API."""
+	from .serving.server import serve as serve_tables
+
+	where = socket_path or f"http://{host}:{port}"
+	click.echo(f"Serving {out_dir} on {where}")
+	try:
+		serve_tables(out_dir, host=host, port=port, socket_path=socket_path, poll_interval=poll_interval, matches_table=matches_table)
+	except FileNotFoundError as exc:
+		raise click.ClickException(str(exc))
+	except KeyboardInterrupt:
+		pass
 
 
 if __name__ == "__main__":
@@ -56,9 +56,10 @@ def build_players(config: BuildConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
 	def col_or_empty(name: str) -> pd.Series:
 		return merged[name] if name in merged.columns else pd.Series([pd.NA] * len(merged), dtype="string")
 
-	full_name = col_or_empty("full_name_norm_x").fillna(col_or_empty("full_name_norm_y"))
-	dob = col_or_empty("dob_x").fillna(col_or_empty("dob_y"))
-	ioc = col_or_empty("ioc_x").fillna(col_or_empty("ioc_y"))
+	# the join keys share their names on both sides, so the merge keeps one unsuffixed column each
+	full_name = col_or_empty("full_name_norm")
+	dob = col_or_empty("dob")
+	ioc = col_or_empty("ioc")
 
 	canonical_id = [
 		stable_id(fn or "", d or "", i or "")
@@ -94,3 +95,52 @@ def build_players(config: BuildConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
 	return dim, alias_df
 
 
+
+
+def resolve_player_ids(matches: pd.DataFrame, players_dim: pd.DataFrame) -> pd.DataFrame:
+	"""Fill missing winner_id/loser_id (e.g. Slam rows) by unique normalized name within the tour."""
+	if matches.empty or players_dim.empty or "gender" not in matches.columns:
+		return matches
+	names = (
+		players_dim["name_first"].map(lambda x: normalize_name(x) if pd.notna(x) else "")
+		+ " "
+		+ players_dim["name_last"].map(lambda x: normalize_name(x) if pd.notna(x) else "")
+	).str.strip()
+	for gender, id_col in (("M", "player_id_atp"), ("W", "player_id_wta")):
+		ids = players_dim[[id_col]].assign(full_name=names).dropna(subset=[id_col])
+		ids = ids[ids["full_name"] != ""].drop_duplicates()
+		# ambiguous names are left unresolved rather than guessed
+		ids = ids.drop_duplicates("full_name", keep=False).set_index("full_name")[id_col]
+		is_gender = matches["gender"].astype("string").eq(gender).fillna(False)
+		for side in ("winner", "loser"):
+			id_field, name_field = f"{side}_id", f"{side}_name"
+			if name_field not in matches.columns:
+				continue
+			if id_field not in matches.columns:
+				matches[id_field] = pd.Series(pd.NA, index=matches.index, dtype="string")
+			missing = is_gender & matches[id_field].astype("string").fillna("").str.strip().eq("")
+			if not missing.any():
+				continue
+			norm = matches.loc[missing, name_field].map(lambda x: normalize_name(x) if pd.notna(x) else "")
+			matches.loc[missing, id_field] = norm.map(ids).astype("string")
+	return matches
+
+
+def canonical_player_ids(ids: pd.Series, genders: pd.Series, players_dim: pd.DataFrame) -> pd.Series:
+	"""player_canonical_id of tour player ids (ATP ids for men, WTA ids for women).
+
+	Ids the dimension does not know are kept as they are, so their matches still count.
+	"""
+	ids = ids.astype("string")
+	out = ids.copy()
+	if players_dim.empty or "player_canonical_id" not in players_dim.columns:
+		return out
+	genders = genders.astype("string")
+	for gender, id_col in (("M", "player_id_atp"), ("W", "player_id_wta")):
+		if id_col not in players_dim.columns:
+			continue
+		known = players_dim[[id_col, "player_canonical_id"]].dropna().astype("string")
+		mapping = known.drop_duplicates(id_col).set_index(id_col)["player_canonical_id"]
+		is_gender = genders.eq(gender).fillna(False)
+		out = out.mask(is_gender, ids.map(mapping).fillna(ids))
+	return out
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, Optional, Tuple
 
 import pandas as pd
 
-from ..utils import normalize_name, read_csv_safely, stable_id
+from ..integrations.sources import FAMILIES, TOUR_FAMILIES
+from ..utils import file_in_scope, in_scope, normalize_name, read_csv_safely, scope_years, tourney_tokens
 
 
 @dataclass
@@ -15,48 +16,174 @@ class BuildConfig:
 	out_dir: Path
 
 
-def _collect_tourneys_from_matches(matches: pd.DataFrame) -> pd.DataFrame:
-	cols = [c for c in ["tourney_id", "tourney_name", "surface", "tourney_level", "draw_size", "tourney_date"] if c in matches.columns]
-	return matches[cols].drop_duplicates()
-
-
-def build_tournaments(config: BuildConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
-	# Load representative ATP/WTA matches to derive tournament dimension
-	atp_matches = []
-	wta_matches = []
-	for year in range(1968, 2025):
-		p = config.data_root / "tennis_atp" / f"atp_matches_{year}.csv"
-		if p.exists():
-			atp_matches.append(read_csv_safely(p, nrows=10000))
-		p2 = config.data_root / "tennis_wta" / f"wta_matches_{year}.csv"
-		if p2.exists():
-			wta_matches.append(read_csv_safely(p2, nrows=10000))
-	atp_df = pd.concat(atp_matches, ignore_index=True) if atp_matches else pd.DataFrame()
-	wta_df = pd.concat(wta_matches, ignore_index=True) if wta_matches else pd.DataFrame()
-
-	base = pd.concat([
-		_collect_tourneys_from_matches(atp_df) if not atp_df.empty else pd.DataFrame(),
-		_collect_tourneys_from_matches(wta_df) if not wta_df.empty else pd.DataFrame(),
-	], ignore_index=True)
-	if base.empty:
-		return pd.DataFrame(columns=["tourney_id","tourney_name","surface","tourney_level","draw_size","tourney_date"]), pd.DataFrame(columns=["tourney_id","alias","source"]) 
-
-	base["tourney_name_norm"] = base["tourney_name"].map(lambda x: normalize_name(x) if pd.notna(x) else "")
-	base = base.drop_duplicates(["tourney_id"]).reset_index(drop=True)
-
-	aliases = base[["tourney_id", "tourney_name_norm"]].drop_duplicates().rename(columns={"tourney_name_norm": "alias"})
-	aliases["source"] = "tour"
-
-	# Slam and MCP aliases derived from filenames only
-	slam_aliases = []
+TOURNEY_COLUMNS = ["tourney_id", "tourney_name", "surface", "tourney_level", "draw_size", "tourney_date", "gender"]
+ALIAS_COLUMNS = ["tourney_id", "alias", "source", "year", "gender"]
+
+def _date_numbers(dates: pd.Series, years: pd.Series) -> pd.Series:
+	# YYYYMMDD as a number; year-only dates sort at Jan 1
+	raw = dates.astype("string").str.strip()
+	full = pd.to_numeric(raw.str.slice(0, 8).where(raw.str.len() >= 8), errors="coerce")
+	return full.fillna(pd.to_numeric(years, errors="coerce") * 10000 + 101)
+
+
+def _keys(names: pd.Series, years: pd.Series, genders: pd.Series) -> pd.Series:
+	frame = pd.DataFrame({
+		"gender": genders.astype("string").fillna("").to_numpy(),
+		"year": years.astype("string").fillna("").to_numpy(),
+		"tokens": tourney_tokens(names).to_numpy(),
+	})
+	return pd.Series(pd.util.hash_pandas_object(frame, index=False).to_numpy(), index=names.index)
+
+
+@dataclass(frozen=True)
+class TournamentIndex:
+	"""(gender, year, name tokens) -> tourney_id over the tournament dimension, resolved in batches.
+
+	Several tournaments can share a key (e.g. weekly futures at one venue); a query then takes
+	the one starting nearest to its date.
+	"""
+	tournaments: pd.DataFrame
+	entries: pd.DataFrame
+
+	@classmethod
+	def from_dimension(cls, tournaments: pd.DataFrame) -> "TournamentIndex":
+		dim = tournaments.reindex(columns=TOURNEY_COLUMNS).astype("string")
+		dim = dim[dim["tourney_id"].notna() & dim["tourney_name"].notna()].drop_duplicates("tourney_id").reset_index(drop=True)
+		year = dim["tourney_date"].str.slice(0, 4)
+		entries = pd.DataFrame({
+			"_key": _keys(dim["tourney_name"], year, dim["gender"]),
+			"_date": _date_numbers(dim["tourney_date"], year),
+			"tourney_id": dim["tourney_id"],
+		}).dropna(subset=["_date"])
+		entries["_date"] = entries["_date"].astype("int64")
+		return cls(tournaments=dim, entries=entries.sort_values("_date", kind="stable").reset_index(drop=True))
+
+	def resolve(self, names: pd.Series, years: pd.Series, genders: pd.Series, dates: Optional[pd.Series] = None) -> pd.Series:
+		"""tourney_id per query row (NA when no tournament of that gender and year has the name)."""
+		out = pd.Series(pd.NA, index=names.index, dtype="string")
+		if names.empty or self.entries.empty:
+			return out
+		years = years.astype("string").str.slice(0, 4)
+		query = pd.DataFrame({
+			"_key": _keys(names, years, genders),
+			"_date": _date_numbers(dates if dates is not None else pd.Series(pd.NA, index=names.index), years),
+			"_pos": range(len(names)),
+		})
+		query = query[names.notna().to_numpy() & query["_date"].notna().to_numpy()]
+		if query.empty:
+			return out
+		query = query.assign(_date=query["_date"].astype("int64"))
+		hits = pd.merge_asof(query.sort_values("_date", kind="stable"), self.entries, on="_date", by="_key", direction="nearest")
+		out.iloc[hits["_pos"].to_numpy()] = hits["tourney_id"].to_numpy()
+		return out
+
+
+def canonical_tourney_ids(matches: pd.DataFrame, index: Optional[TournamentIndex]) -> pd.DataFrame:
+	"""Point rows whose tourney_id is not in the dimension (Slam slugs, futures rows without one) at
+	the tournament of the same gender, year and name, filling its date and empty event metadata."""
+	if index is None or matches.empty or "tourney_name" not in matches.columns:
+		return matches
+	ids = matches.get("tourney_id", pd.Series(pd.NA, index=matches.index)).astype("string")
+	todo = ~ids.isin(index.tournaments["tourney_id"]).to_numpy()
+	if not todo.any():
+		return matches
+	rows = matches[todo]
+	dates = rows.get("tourney_date", pd.Series(pd.NA, index=rows.index)).astype("string")
+	resolved = index.resolve(rows["tourney_name"], dates.str.slice(0, 4), rows.get("gender", pd.Series(pd.NA, index=rows.index)), dates)
+	resolved = resolved.dropna()
+	if resolved.empty:
+		return matches
+	matches.loc[resolved.index, "tourney_id"] = resolved
+	events = index.tournaments.set_index("tourney_id")
+	for col in ("tourney_date", "surface", "tourney_level", "draw_size"):
+		if col not in matches.columns:
+			matches[col] = pd.Series(pd.NA, index=matches.index, dtype="string")
+		current = matches.loc[resolved.index, col].astype("string").str.strip()
+		# Slam files only carry the year; the tournament knows the start date
+		empty = current.isna() | current.eq("") | (current.str.len() == 4 if col == "tourney_date" else False)
+		fill = resolved[empty.to_numpy()]
+		matches.loc[fill.index, col] = fill.map(events[col]).to_numpy()
+	return matches
+
+
+def _tour_tourneys(config: BuildConfig, families: Iterable[str]) -> pd.DataFrame:
+	frames = []
+	for name in families:
+		family = FAMILIES[name]
+		if not in_scope(config, tour=family.tour, source=family.scope):
+			continue
+		for p in family.paths(config.data_root, scope_years(config, family.years)):
+			df = read_csv_safely(p, usecols=lambda c: c in TOURNEY_COLUMNS)
+			df["gender"] = family.gender
+			frames.append(df.drop_duplicates())
+	if not frames:
+		return pd.DataFrame(columns=TOURNEY_COLUMNS)
+	return pd.concat(frames, ignore_index=True).reindex(columns=TOURNEY_COLUMNS)
+
+
+def _slam_aliases(config: BuildConfig, index: TournamentIndex) -> pd.DataFrame:
+	# slam files are named <year>-<slug>-matches.csv / -points.csv and mix both draws
+	found = set()
 	for p in (config.data_root / "tennis_slam_pointbypoint").glob("*.csv"):
-		name = p.stem
-		if "-matches" in name or "-points" in name:
-			slam_aliases.append({"tourney_id": None, "alias": normalize_name(name.split("-")[1]), "source": "slam_pbp"})
-	mcp_aliases = []
-	for p in (config.data_root / "tennis_MatchChartingProject").glob("charting-*-matches.csv"):
-		mcp_aliases.append({"tourney_id": None, "alias": "", "source": "mcp"})
-	alias_df = pd.concat([aliases, pd.DataFrame(slam_aliases), pd.DataFrame(mcp_aliases)], ignore_index=True)
-	return base.drop(columns=["tourney_name_norm"], errors="ignore"), alias_df
+		if not file_in_scope(config, p, "slam_pbp"):
+			continue
+		parts = p.stem.split("-")
+		if len(parts) >= 3 and ("-matches" in p.stem or "-points" in p.stem):
+			found.add((parts[1], parts[0]))
+	genders = [g for g, tour in (("M", "atp"), ("W", "wta")) if in_scope(config, tour=tour)]
+	rows = pd.DataFrame(
+		[(slug, year, gender) for slug, year in sorted(found) for gender in genders],
+		columns=["alias", "year", "gender"],
+		dtype="string",
+	)
+	rows["tourney_id"] = index.resolve(rows["alias"], rows["year"], rows["gender"])
+	rows["alias"] = rows["alias"].map(normalize_name)
+	rows["source"] = "slam_pbp"
+	return rows
+
+
+def _mcp_aliases(config: BuildConfig, index: TournamentIndex) -> pd.DataFrame:
+	frames = []
+	for p in sorted((config.data_root / "tennis_MatchChartingProject").glob("charting-*-matches.csv")):
+		if not file_in_scope(config, p, "mcp"):
+			continue
+		df = read_csv_safely(p, usecols=lambda c: c in ("Tournament", "Date"))
+		if df.empty or "Tournament" not in df.columns:
+			continue
+		# charting-m-matches.csv / charting-w-matches.csv
+		gender = {"m": "M", "w": "W"}.get(p.stem.split("-")[1])
+		df = pd.DataFrame({
+			"alias": df["Tournament"].astype("string"),
+			"year": df.get("Date", pd.Series(pd.NA, index=df.index)).astype("string").str.slice(0, 4),
+			"date": df.get("Date", pd.Series(pd.NA, index=df.index)).astype("string"),
+			"gender": gender,
+		})
+		frames.append(df.drop_duplicates(["alias", "year"]))
+	if not frames:
+		return pd.DataFrame(columns=ALIAS_COLUMNS)
+	rows = pd.concat(frames, ignore_index=True)
+	rows["tourney_id"] = index.resolve(rows["alias"], rows["year"], rows["gender"], rows["date"])
+	rows["alias"] = rows["alias"].map(lambda x: normalize_name(x) if pd.notna(x) else "")
+	rows["source"] = "mcp"
+	return rows
+
+
+def build_tournaments(config: BuildConfig, families: Iterable[str] = TOUR_FAMILIES) -> Tuple[pd.DataFrame, pd.DataFrame, TournamentIndex]:
+	"""Tournament dimension from the tournament columns of every tour file, its alias table and index.
 
+	Slam and MCP names in the alias table carry the tourney_id they resolve to through the index.
+	"""
+	base = _tour_tourneys(config, families)
+	base = base[base["tourney_id"].notna()].drop_duplicates(["tourney_id"]).reset_index(drop=True)
+	index = TournamentIndex.from_dimension(base)
 
+	aliases = pd.DataFrame({
+		"tourney_id": base["tourney_id"],
+		"alias": base["tourney_name"].map(lambda x: normalize_name(x) if pd.notna(x) else ""),
+		"source": "tour",
+		"year": base["tourney_date"].astype("string").str.slice(0, 4),
+		"gender": base["gender"],
+	}).drop_duplicates()
+	frames = [f for f in (aliases, _slam_aliases(config, index), _mcp_aliases(config, index)) if not f.empty]
+	alias_df = pd.concat(frames, ignore_index=True)[ALIAS_COLUMNS] if frames else pd.DataFrame(columns=ALIAS_COLUMNS)
+	return base, alias_df, index
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from ..utils import squashed_names, tourney_tokens
+from .slam_mcp_flags import SLAM_START_MMDD, match_dates
+
+
+# lower value wins when the same match arrives from several sources
+SOURCE_PRIORITY: Dict[str, int] = {
+	"atp": 0,
+	"wta": 0,
+	"atp_futures": 1,
+	"slam_pbp": 2,
+	"mcp": 3,
+}
+
+# rows from different sources are the same match only if their tourney dates are this close;
+# Slam rows without a resolved date sit at the usual start of the event
+MATCH_WINDOW_DAYS = 10
+
+# Slam files number rounds 1..7 from the first round of a 128 draw
+SLAM_ROUNDS: Dict[str, str] = {
+	"1": "R128", "2": "R64", "3": "R32", "4": "R16", "5": "QF", "6": "SF", "7": "F",
+}
+
+
+def _col(df: pd.DataFrame, name: str) -> pd.Series:
+	return df[name].astype("string") if name in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+
+
+def match_keys(df: pd.DataFrame) -> pd.Series:
+	"""Source-independent match key: gender, tourney alias, round and unordered player pair.
+
+	Returns a uint64 hash per row; rows without both player names get NA and are never merged.
+	The key carries no date: `dedup_matches` only pairs rows whose tourney dates are close.
+	"""
+	tourney = tourney_tokens(_col(df, "tourney_name"))
+	rnd = _col(df, "round").str.strip().str.upper()
+	is_slam = _col(df, "source").eq("slam_pbp").fillna(False)
+	rnd = rnd.mask(is_slam, rnd.map(SLAM_ROUNDS)).fillna("")
+	w = squashed_names(_col(df, "winner_name"))
+	l = squashed_names(_col(df, "loser_name"))
+	lo = w.where(w <= l, l)
+	hi = l.where(w <= l, w)
+	key_frame = pd.DataFrame({
+		"gender": _col(df, "gender").fillna(""),
+		"tourney": tourney,
+		"round": rnd,
+		"p1": lo,
+		"p2": hi,
+	})
+	keys = pd.Series(pd.util.hash_pandas_object(key_frame, index=False).to_numpy(), index=df.index, dtype="UInt64")
+	return keys.mask((w == "") | (l == ""))
+
+
+def _match_days(df: pd.DataFrame) -> np.ndarray:
+	"""Tourney start as days since the epoch; NaN when the date is missing or invalid."""
+	dates = pd.Series(match_dates(df)).astype(str)
+	parsed = pd.to_datetime(dates, format="%Y%m%d", errors="coerce")
+	days = (parsed - pd.Timestamp(0)).dt.days
+	return days.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _tour_ids(df: pd.DataFrame) -> pd.Series:
+	"""tourney_id where it is a tour id (ATP/WTA/futures files share one id space); NA for Slam slugs."""
+	ids = _col(df, "tourney_id").str.strip().replace("", pd.NA)
+	return ids.mask(ids.str.lower().isin(SLAM_START_MMDD))
+
+
+def _survivors(df: pd.DataFrame, keys: pd.Series) -> np.ndarray:
+	"""Position of the row each row merges into (its own position when it survives).
+
+	Sources are taken in priority order; a row joins the surviving row of a higher-priority source
+	with the same key and the nearest tourney date within MATCH_WINDOW_DAYS. Rows of one source
+	never merge with each other, a survivor takes at most one row per source, and two different
+	tour tourney_ids are never the same match.
+	"""
+	n = len(df)
+	into = np.arange(n)
+	days = _match_days(df)
+	eligible = keys.notna().to_numpy() & ~np.isnan(days)
+	rows = pd.DataFrame({
+		"_pos": np.arange(n),
+		"_key": keys.to_numpy(dtype="uint64", na_value=0),
+		"_day": np.nan_to_num(days).astype("int64"),
+		"_prio": _col(df, "source").map(SOURCE_PRIORITY).fillna(len(SOURCE_PRIORITY)).astype(int).to_numpy(),
+		"_source": _col(df, "source").fillna("").to_numpy(),
+		"_tid": _tour_ids(df).to_numpy(),
+	})[eligible]
+	rows = rows[rows["_key"].duplicated(keep=False)]
+	for level in sorted(rows["_prio"].unique()):
+		query = rows[rows["_prio"] == level]
+		anchors = rows[(rows["_prio"] < level) & (into[rows["_pos"].to_numpy()] == rows["_pos"].to_numpy())]
+		if query.empty or anchors.empty:
+			continue
+		anchors = anchors[["_key", "_day", "_pos", "_tid"]].rename(columns={"_pos": "_into", "_tid": "_into_tid"})
+		anchors["_into_day"] = anchors["_day"]
+		hits = pd.merge_asof(
+			query.sort_values("_day", kind="stable"),
+			anchors.sort_values("_day", kind="stable"),
+			on="_day", by="_key", direction="nearest", tolerance=MATCH_WINDOW_DAYS,
+		).dropna(subset=["_into"])
+		tid, into_tid = hits["_tid"].astype("string"), hits["_into_tid"].astype("string")
+		hits = hits[~(tid != into_tid).fillna(False).to_numpy(dtype=bool)]
+		hits = hits.assign(_gap=(hits["_day"] - hits["_into_day"]).abs())
+		hits = hits.sort_values(["_gap", "_pos"], kind="stable").drop_duplicates(["_into", "_source"])
+		into[hits["_pos"].to_numpy()] = hits["_into"].to_numpy(dtype="int64")
+	return into
+
+
+def dedup_matches(df: pd.DataFrame) -> pd.DataFrame:
+	"""Collapse rows describing the same match into one, filling fields by source priority.
+
+	The surviving row takes the position and match_id of the highest-priority source; its empty
+	fields are filled from the lower-priority duplicates, and a Slam duplicate sets has_points=Y.
+	"""
+	if df.empty:
+		return df
+	keys = match_keys(df)
+	if not (keys.duplicated(keep=False) & keys.notna()).any():
+		return df
+	base = df.reset_index(drop=True)
+	into = _survivors(base, keys.reset_index(drop=True))
+	absorbed = into != np.arange(len(base))
+	if not absorbed.any():
+		return df
+	grouped = absorbed | np.isin(np.arange(len(base)), into[absorbed])
+	sub = base.loc[grouped].copy()
+	sub["_group"] = into[grouped]
+	sub["_prio"] = _col(sub, "source").map(SOURCE_PRIORITY).fillna(len(SOURCE_PRIORITY)).astype(int)
+	sub = sub.sort_values(["_group", "_prio"], kind="stable")
+	# first() takes the first non-null value per column, i.e. a priority-ordered coalesce
+	merged = sub.drop(columns=["_prio"]).groupby("_group", sort=False).first()
+	if "source" in sub.columns and "has_points" in merged.columns:
+		has_slam = sub["source"].eq("slam_pbp").groupby(sub["_group"], sort=False).any()
+		merged.loc[has_slam[has_slam].index, "has_points"] = "Y"
+	out = pd.concat([base.loc[~grouped], merged[base.columns]]).sort_index(kind="stable")
+	return out.reset_index(drop=True)
@@ -2,50 +2,39 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
-from ..utils import normalize_name, read_csv_safely, stable_id
+from ..staging.validation import ValidationReport
+from ..utils import normalize_name, stable_id
+from .scores import SCORE_COLUMNS
+from .sources import TOUR_FAMILIES, load_sources, normalize_levels
 
 
 @dataclass
 class BuildConfig:
 	data_root: Path
 	out_dir: Path
+	strict_validation: bool = False
+	years: Optional[Tuple[int, ...]] = None
+	tours: Optional[frozenset] = None
+	sources: Optional[frozenset] = None
 
 
-def _load_tour_matches(root: Path, tour: str) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
-    base_dir = root / ("tennis_atp" if tour == "atp" else "tennis_wta")
-    for year in range(1968, 2026):
-        # main draw singles
-        p_main = base_dir / f"{tour}_matches_{year}.csv"
-        if p_main.exists():
-            dfm = read_csv_safely(p_main)
-            dfm["discipline"] = "singles"
-            frames.append(dfm)
-        # qualifying (ATP qualifiers/challengers, WTA qual/ITF)
-        if tour == "atp":
-            p_qual = base_dir / f"{tour}_matches_qual_chall_{year}.csv"
-            if p_qual.exists():
-                dfq = read_csv_safely(p_qual)
-                dfq["discipline"] = "singles"
-                frames.append(dfq)
-        else:
-            p_qual = base_dir / f"{tour}_matches_qual_itf_{year}.csv"
-            if p_qual.exists():
-                dfq = read_csv_safely(p_qual)
-                dfq["discipline"] = "singles"
-                frames.append(dfq)
-    if not frames:
-        return pd.DataFrame()
-    df = pd.concat(frames, ignore_index=True)
-    df["source"] = tour
-    return df
-
-
-def _canonicalize_matches(df: pd.DataFrame, gender: str) -> pd.DataFrame:
+MATCH_COLUMNS = [
+	"match_id","source","tourney_id","tourney_name","surface","draw_size","tourney_level","tourney_date","match_num",
+	"winner_id","winner_seed","winner_entry","winner_name","winner_hand","winner_ht","winner_ioc","winner_age",
+	"loser_id","loser_seed","loser_entry","loser_name","loser_hand","loser_ht","loser_ioc","loser_age",
+	"score","best_of","round","minutes",
+	"w_ace","w_df","w_svpt","w_1stIn","w_1stWon","w_2ndWon","w_SvGms","w_bpSaved","w_bpFaced",
+	"l_ace","l_df","l_svpt","l_1stIn","l_1stWon","l_2ndWon","l_SvGms","l_bpSaved","l_bpFaced",
+	"winner_rank","winner_rank_points","loser_rank","loser_rank_points",
+	"gender","discipline"
+]
+
+
+def _canonicalize_matches(df: pd.DataFrame) -> pd.DataFrame:
 	if df.empty:
 		return df
 	# Normalize key string columns
@@ -64,31 +53,41 @@ def _canonicalize_matches(df: pd.DataFrame, gender: str) -> pd.DataFrame:
 		return stable_id(tid, date, str(round), str(min(w, l)), str(max(w, l)))
 
 	df["match_id"] = df.apply(make_id, axis=1)
-	df["gender"] = gender
 	df["discipline"] = "singles"
 	return df
 
 
-def integrate_atp_wta(config: BuildConfig) -> pd.DataFrame:
-	atp = _canonicalize_matches(_load_tour_matches(config.data_root, "atp"), gender="M")
-	wta = _canonicalize_matches(_load_tour_matches(config.data_root, "wta"), gender="W")
-	cols = [
-		"match_id","source","tourney_id","tourney_name","surface","draw_size","tourney_level","tourney_date","match_num",
-		"winner_id","winner_seed","winner_entry","winner_name","winner_hand","winner_ht","winner_ioc","winner_age",
-		"loser_id","loser_seed","loser_entry","loser_name","loser_hand","loser_ht","loser_ioc","loser_age",
-		"score","best_of","round","minutes",
-		"w_ace","w_df","w_svpt","w_1stIn","w_1stWon","w_2ndWon","w_SvGms","w_bpSaved","w_bpFaced",
-		"l_ace","l_df","l_svpt","l_1stIn","l_1stWon","l_2ndWon","l_SvGms","l_bpSaved","l_bpFaced",
-		"winner_rank","winner_rank_points","loser_rank","loser_rank_points",
-		"gender","discipline"
-	]
-	base = pd.concat([atp, wta], ignore_index=True)
-	base = base[[c for c in cols if c in base.columns]]
+def integrate_matches(config: BuildConfig, years: Optional[Iterable[int]] = None, reports: Optional[Sequence[ValidationReport]] = None, families: Iterable[str] = TOUR_FAMILIES) -> pd.DataFrame:
+	"""Load and canonicalize the registry `families` of `years` (all years by default) with one `load_sources` call.
+
+	Each report validates the rows of its sources; without reports, one is written here.
+	"""
+	own_report = reports is None
+	if own_report:
+		reports = [ValidationReport(config)]
+	raw = load_sources(config, years, families)
+	# validate raw rows right after loading, before the row-wise canonicalization
+	for report in reports:
+		report.check(raw)
+	if own_report:
+		reports[0].write()
+	base = _canonicalize_matches(raw)
+	base = base[[c for c in MATCH_COLUMNS if c in base.columns]]
 	base["has_points"] = "N"
 	base["has_shots"] = "N"
 	return base
 
 
+def match_output_columns() -> List[str]:
+	"""Column order of the written matches tables, after enrich_match_fields and score parsing."""
+	cols = list(MATCH_COLUMNS)
+	td_idx = cols.index("tourney_date")
+	cols[td_idx:td_idx + 1] = ["event_year", "event_month", "event_date"]
+	score_idx = cols.index("score")
+	cols[score_idx:score_idx + 1] = ["set1", "set2", "set3", "set4", "set5"]
+	return cols + ["has_points", "has_shots", "slam_match_id"] + SCORE_COLUMNS
+
+
 def enrich_match_fields(df: pd.DataFrame) -> pd.DataFrame:
 	if df.empty:
 		return df
@@ -150,63 +149,7 @@ def normalize_tourney_level(df: pd.DataFrame) -> pd.DataFrame:
 	"""Normalize tourney_level values to human-readable names."""
 	if df.empty or "tourney_level" not in df.columns:
 		return df
-	
 	out = df.copy()
-	
-	# Define mapping rules
-	def map_level(level: str, source: str) -> str:
-		if pd.isna(level) or level == "":
-			return "Unknown"
-		
-		level = str(level).strip()
-		
-		# ATP mappings
-		if source == "atp":
-			if level == "G": return "Grand Slam"
-			elif level == "M": return "ATP Tour"
-			elif level == "A": return "ATP Tour"
-			elif level == "S": return "Futures"
-			elif level == "C": return "Challengers"
-			elif level == "D": return "Davis Cup"
-			elif level == "F": return "Tour Finals"
-			elif level == "O": return "Other"
-			elif level == "E": return "Exhibition"
-			elif level == "J": return "Juniors"
-			elif level == "CC": return "Challengers"
-		
-		# WTA mappings
-		elif source == "wta":
-			if level == "G": return "Grand Slam"
-			elif level == "P": return "WTA Tour"
-			elif level == "PM": return "WTA Tour"
-			elif level == "I": return "International"
-			elif level == "C": return "Challengers"
-			elif level == "D": return "BJK Cup"
-			elif level == "W": return "Tour Finals"
-			elif level == "E": return "Exhibition"
-			elif level == "J": return "Juniors"
-			elif level == "CC": return "Challengers"
-			elif level in ["T1", "T2", "T3", "T4", "T5"]: return "WTA Tour"
-			# ITF prize money levels
-			elif level.isdigit() and int(level) >= 10: return f"ITF ${level}K"
-		
-		# Slam and MCP mappings (keep as is or map to generic)
-		elif source in ["slam_pbp", "mcp"]:
-			if level == "G": return "Grand Slam"
-			else: return "Unknown"
-		
-		# Default fallback
-		return level
-	
-	# Apply mapping
-	if "source" in out.columns:
-		out["tourney_level"] = out.apply(
-			lambda row: map_level(row.get("tourney_level", ""), row.get("source", "")), 
-			axis=1
-		)
-	else:
-		out["tourney_level"] = out["tourney_level"].map(lambda x: map_level(x, ""))
-	
+	source = out["source"] if "source" in out.columns else pd.Series("", index=out.index)
+	out["tourney_level"] = normalize_levels(out["tourney_level"], source)
 	return out
-
-
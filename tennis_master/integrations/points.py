@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+_FLAGS = (
+	"Ace", "Winner", "DoubleFault", "UnfErr", "NetPoint", "NetPointWon", "BreakPoint", "BreakPointWon",
+	"BreakPointMissed", "FirstSrvIn", "FirstSrvWon", "SecondSrvIn", "SecondSrvWon", "ForcedError", "TurningPoint",
+)
+
+# compact dtypes of the slam point columns; a column keeps its text when any value does not fit
+POINT_DTYPES: Dict[str, str] = {
+	**{c: "UInt8" for c in (
+		"SetNo", "P1GamesWon", "P2GamesWon", "SetWinner", "GameNo", "GameWinner", "PointWinner", "PointServer",
+		"ServeIndicator", "ServeNumber",
+	)},
+	**{f"{p}{flag}": "UInt8" for flag in _FLAGS for p in ("P1", "P2")},
+	**{c: "UInt16" for c in ("PointNumber", "Speed_KMH", "Speed_MPH", "Rally", "RallyCount", "P1PointsWon", "P2PointsWon")},
+	**{c: "Float32" for c in ("P1DistanceRun", "P2DistanceRun", "P1Momentum", "P2Momentum")},
+	**{c: "category" for c in (
+		"P1Score", "P2Score", "Serve_Direction", "Winner_FH", "Winner_BH", "ServingTo", "WinnerType",
+		"WinnerShotType", "ServeWidth", "ServeDepth", "ReturnDepth",
+	)},
+}
+
+# per-match aggregates, from the match winner's (w_) and loser's (l_) side
+AGGREGATE_COLUMNS = [
+	"match_id", "winner_id", "loser_id", "points",
+	"w_serve_points", "w_serve_points_won", "l_serve_points", "l_serve_points_won",
+	"w_aces", "l_aces", "w_double_faults", "l_double_faults",
+	"w_break_points", "w_break_points_won", "l_break_points", "l_break_points_won",
+	"rally_mean", "rally_max", "w_distance_run", "l_distance_run",
+]
+
+# columns normalize_points adds to the raw point rows
+POINT_SIDE_COLUMNS = ["server_side", "point_winner_side", "server_id", "point_winner_id"]
+
+_RANGES = {"UInt8": 255, "UInt16": 65535}
+
+
+def _compact(values: pd.Series, dtype: str) -> pd.Series:
+	text = values.astype("string").str.strip().replace("", pd.NA)
+	if dtype == "category":
+		return text.astype("category")
+	num = pd.to_numeric(text, errors="coerce")
+	if (num.isna() & text.notna()).any():
+		return values
+	if dtype in _RANGES:
+		if ((num % 1 != 0) | (num < 0) | (num > _RANGES[dtype])).fillna(False).any():
+			return values
+	return num.astype(dtype)
+
+
+def slam_pairs(matches: pd.DataFrame) -> pd.DataFrame:
+	"""slam_match_id -> canonical winner_id/loser_id of the finished matches rows that came from a slam."""
+	if matches.empty or "slam_match_id" not in matches.columns:
+		return pd.DataFrame(columns=["slam_match_id", "winner_id", "loser_id"])
+	rows = matches[matches["slam_match_id"].notna()]
+	return rows[["slam_match_id", "winner_id", "loser_id"]].astype("string")
+
+
+def _pair_ids(ids: pd.Series, pairs: Optional[pd.DataFrame]):
+	if pairs is None or pairs.empty:
+		blank = pd.Series(pd.NA, index=ids.index, dtype="string")
+		return blank, blank
+	pair = pairs.drop_duplicates("slam_match_id").set_index("slam_match_id")
+	return ids.map(pair["winner_id"]).astype("string"), ids.map(pair["loser_id"]).astype("string")
+
+
+def normalize_points(points: pd.DataFrame, match_winner: pd.Series, pairs: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+	"""Cast slam point rows to compact dtypes and express server/point winner on the canonical pair.
+
+	`match_winner` maps slam match_id -> 1/2 (which of player1/player2 won the match) and `pairs`
+	maps slam match_id -> canonical winner_id/loser_id. Adds `server_side`/`point_winner_side`
+	("W"/"L" for the match winner/loser) and `server_id`/`point_winner_id`.
+	"""
+	out = points.copy()
+	for col, dtype in POINT_DTYPES.items():
+		if col in out.columns:
+			out[col] = _compact(out[col], dtype)
+	ids = out["match_id"].astype("string")
+	winner = pd.to_numeric(ids.map(match_winner), errors="coerce")
+	sides = {}
+	for col, name in (("PointServer", "server"), ("PointWinner", "point_winner")):
+		player = pd.to_numeric(out.get(col, pd.Series(pd.NA, index=out.index)), errors="coerce")
+		# 0 marks points without a server/winner (e.g. penalty points)
+		player = player.where(player.isin([1, 2]))
+		side = pd.Series(np.where((player == winner).fillna(False), "W", "L"), index=out.index, dtype="string")
+		sides[name] = side.mask(player.isna() | winner.isna())
+		out[f"{name}_side"] = sides[name].astype("category")
+	w_id, l_id = _pair_ids(ids, pairs)
+	for name, side in sides.items():
+		out[f"{name}_id"] = w_id.where(side == "W", l_id.where(side == "L"))
+	return out
+
+
+def _by_side(points: pd.DataFrame, p1: str, p2: str, winner: pd.Series) -> Dict[str, pd.Series]:
+	"""Split a P1/P2 column pair into match-winner and match-loser columns."""
+	a = pd.to_numeric(points.get(p1, pd.Series(pd.NA, index=points.index)), errors="coerce").astype("Float64")
+	b = pd.to_numeric(points.get(p2, pd.Series(pd.NA, index=points.index)), errors="coerce").astype("Float64")
+	return {"W": a.where(winner == 1, b.where(winner == 2)), "L": b.where(winner == 1, a.where(winner == 2))}
+
+
+def aggregate_points(points: pd.DataFrame, match_winner: pd.Series, pairs: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+	"""Per-match serve, break point, rally and distance aggregates of normalized points, in one groupby pass.
+
+	Break points are counted from the returner's side, as the Slam P1/P2BreakPoint flags are:
+	w_break_points are the chances the match winner had to break and w_break_points_won the ones
+	converted (not break points faced on serve, unlike the tour files' bpFaced/bpSaved).
+	"""
+	if points.empty:
+		return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+	winner = pd.to_numeric(points["match_id"].astype("string").map(match_winner), errors="coerce")
+	server = points["server_side"].astype("string")
+	point_winner = points["point_winner_side"].astype("string")
+	aces = _by_side(points, "P1Ace", "P2Ace", winner)
+	dfs = _by_side(points, "P1DoubleFault", "P2DoubleFault", winner)
+	bps = _by_side(points, "P1BreakPoint", "P2BreakPoint", winner)
+	bps_won = _by_side(points, "P1BreakPointWon", "P2BreakPointWon", winner)
+	dist = _by_side(points, "P1DistanceRun", "P2DistanceRun", winner)
+	rally = pd.to_numeric(points.get("Rally", pd.Series(pd.NA, index=points.index)), errors="coerce")
+	rally = rally.fillna(pd.to_numeric(points.get("RallyCount", pd.Series(pd.NA, index=points.index)), errors="coerce"))
+	parts = pd.DataFrame({"match_id": points["match_id"].astype("string"), "points": 1, "rally": rally.astype("Float64")})
+	for s, prefix in (("W", "w"), ("L", "l")):
+		serving = server.eq(s).fillna(False)
+		parts[f"{prefix}_serve_points"] = serving.astype("int32")
+		parts[f"{prefix}_serve_points_won"] = (serving & point_winner.eq(s).fillna(False)).astype("int32")
+		parts[f"{prefix}_aces"] = aces[s]
+		parts[f"{prefix}_double_faults"] = dfs[s]
+		parts[f"{prefix}_break_points"] = bps[s]
+		parts[f"{prefix}_break_points_won"] = bps_won[s]
+		parts[f"{prefix}_distance_run"] = dist[s]
+	sums = [c for c in parts.columns if c not in ("match_id", "rally")]
+	agg = parts.groupby("match_id", sort=False).agg(
+		**{c: (c, "sum") for c in sums},
+		**{f"_n_{c}": (c, "count") for c in sums},
+		rally_mean=("rally", "mean"),
+		rally_max=("rally", "max"),
+	)
+	# a stat no point of the match recorded stays empty instead of summing to 0
+	for col in sums:
+		agg[col] = agg[col].mask(agg.pop(f"_n_{col}") == 0)
+		if not col.endswith("distance_run"):
+			agg[col] = agg[col].astype("Int32")
+	agg["rally_mean"] = agg["rally_mean"].round(2)
+	agg["rally_max"] = agg["rally_max"].round().astype("Int32")
+	for col in ("w_distance_run", "l_distance_run"):
+		agg[col] = agg[col].round(1)
+	agg = agg.reset_index()
+	agg["winner_id"], agg["loser_id"] = _pair_ids(agg["match_id"].astype("string"), pairs)
+	return agg.reindex(columns=AGGREGATE_COLUMNS)
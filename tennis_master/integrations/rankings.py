@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils import file_in_scope, file_years, in_scope, read_csv_safely
+from .slam_mcp_flags import match_dates
+
+
+@dataclass
+class BuildConfig:
+	data_root: Path
+	out_dir: Path
+
+
+RANKING_COLUMNS = ["ranking_date", "rank", "player", "points"]
+# a ranking older than this at match time is treated as "unranked"
+MAX_RANKING_AGE_DAYS = 92
+_CHUNK_ROWS = 1_000_000
+_DATE_BITS = 32
+_DATE_MASK = (1 << _DATE_BITS) - 1
+_NAT = np.iinfo(np.int64).min
+
+
+@dataclass
+class RankingTable:
+	"""Weekly rankings of one tour as parallel arrays sorted by (player_id, ranking_date).
+
+	Each key packs the player id in the high bits and the yyyymmdd ranking date in the
+	low bits, so a single ``searchsorted`` performs a per-player as-of lookup.
+	"""
+	keys: np.ndarray
+	rank: np.ndarray
+	points: np.ndarray
+
+	def __len__(self) -> int:
+		return len(self.keys)
+
+	def lookup(self, player_ids: np.ndarray, dates: np.ndarray, max_age_days: int = MAX_RANKING_AGE_DAYS) -> Tuple[np.ndarray, np.ndarray]:
+		"""Return (rank, points) of each player as of each date; -1 where unknown."""
+		rank = np.full(len(player_ids), -1, dtype=np.int32)
+		points = np.full(len(player_ids), -1, dtype=np.int32)
+		valid = (player_ids >= 0) & (dates > 0)
+		if not len(self.keys) or not valid.any():
+			return rank, points
+		query = (player_ids[valid] << _DATE_BITS) | dates[valid]
+		idx = np.searchsorted(self.keys, query, side="right") - 1
+		found = idx >= 0
+		idx = np.where(found, idx, 0)
+		hit = self.keys[idx]
+		found &= (hit >> _DATE_BITS) == player_ids[valid]
+		match_days = _to_days(dates[valid])
+		ranking_days = _to_days(hit & _DATE_MASK)
+		# an unparseable date (e.g. 20190230) is NaT, whose int64 value would pass any age check
+		found &= (match_days != _NAT) & (ranking_days != _NAT)
+		age = match_days - ranking_days
+		found &= (age >= 0) & (age <= max_age_days)
+		pos = np.flatnonzero(valid)[found]
+		rank[pos] = self.rank[idx[found]]
+		points[pos] = self.points[idx[found]]
+		return rank, points
+
+
+def _to_days(yyyymmdd: np.ndarray) -> np.ndarray:
+	"""Days since the epoch of yyyymmdd integers; invalid dates become the int64 minimum (NaT)."""
+	dates = pd.to_datetime(pd.Series(yyyymmdd, dtype="int64").astype("string"), format="%Y%m%d", errors="coerce")
+	return dates.to_numpy(dtype="datetime64[D]").astype("int64")
+
+
+def _ranking_files(config: BuildConfig, tour: str) -> List[Path]:
+	base_dir = config.data_root / ("tennis_atp" if tour == "atp" else "tennis_wta")
+	# a year's first matches need the rankings published late in the previous year
+	return [p for p in sorted(base_dir.glob(f"{tour}_rankings_*.csv")) if file_in_scope(config, p, tour, lookback_years=1)]
+
+
+def _read_ranking_file(path: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""(keys, rank, points) of one rankings file, in file order."""
+	keys: List[np.ndarray] = []
+	ranks: List[np.ndarray] = []
+	points: List[np.ndarray] = []
+	# numeric columns only: rankings files hold tens of millions of rows
+	for chunk in read_csv_safely(path, usecols=lambda c: c in RANKING_COLUMNS, dtype="float64", chunksize=_CHUNK_ROWS):
+		chunk = chunk.dropna(subset=["ranking_date", "player"])
+		keys.append((chunk["player"].to_numpy("int64") << _DATE_BITS) | chunk["ranking_date"].to_numpy("int64"))
+		ranks.append(chunk["rank"].fillna(-1).to_numpy("int32"))
+		points.append(chunk.get("points", pd.Series(-1, index=chunk.index)).fillna(-1).to_numpy("int32"))
+	if not keys:
+		return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+	return np.concatenate(keys), np.concatenate(ranks), np.concatenate(points)
+
+
+def _ranking_table(files: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> RankingTable:
+	if not files:
+		empty = np.empty(0, dtype=np.int32)
+		return RankingTable(keys=np.empty(0, dtype=np.int64), rank=empty, points=empty)
+	all_keys = np.concatenate([f[0] for f in files])
+	order = np.argsort(all_keys, kind="stable")
+	all_keys = all_keys[order]
+	# later files (e.g. *_current) win over overlapping weeks of earlier ones
+	last = np.append(all_keys[1:] != all_keys[:-1], True)
+	order = order[last]
+	return RankingTable(
+		keys=all_keys[last],
+		rank=np.concatenate([f[1] for f in files])[order],
+		points=np.concatenate([f[2] for f in files])[order],
+	)
+
+
+def load_rankings(config: BuildConfig) -> Dict[str, RankingTable]:
+	return {
+		tour: _ranking_table([_read_ranking_file(p) for p in _ranking_files(config, tour)])
+		for tour in ("atp", "wta") if in_scope(config, tour=tour)
+	}
+
+
+def _covers(path: Path, years: set) -> bool:
+	covered = file_years(path.name.lower())
+	return covered is None or bool(years.intersection(covered))
+
+
+class RankingWindow:
+	"""Rankings for one year partition at a time, for --low-memory builds.
+
+	Only the ranking files covering the partition or the year before it are held; a file stays
+	cached while consecutive partitions need it and is dropped once the window has moved past it.
+	"""
+
+	def __init__(self, config: BuildConfig):
+		self.files = {tour: _ranking_files(config, tour) for tour in ("atp", "wta") if in_scope(config, tour=tour)}
+		self._cache: Dict[Path, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+	def tables(self, years: Iterable[int]) -> Dict[str, RankingTable]:
+		years = list(years)
+		wanted = set(range(min(years) - 1, max(years) + 1)) if years else set()
+		needed = {tour: [p for p in paths if _covers(p, wanted)] for tour, paths in self.files.items()}
+		held = {p for paths in needed.values() for p in paths}
+		self._cache = {p: data for p, data in self._cache.items() if p in held}
+		for path in sorted(held - set(self._cache)):
+			self._cache[path] = _read_ranking_file(path)
+		return {tour: _ranking_table([self._cache[p] for p in paths]) for tour, paths in needed.items()}
+
+
+def _as_ids(values: pd.Series) -> np.ndarray:
+	return pd.to_numeric(values, errors="coerce").fillna(-1).to_numpy("int64")
+
+
+def attach_rankings(matches: pd.DataFrame, rankings: Dict[str, RankingTable]) -> pd.DataFrame:
+	"""Fill missing winner/loser rank and points from the rankings in force at the match date."""
+	if matches.empty or "gender" not in matches.columns:
+		return matches
+	dates = match_dates(matches)
+	gender = matches["gender"].astype("string").fillna("")
+	for side in ("winner", "loser"):
+		if f"{side}_id" not in matches.columns:
+			continue
+		ids = _as_ids(matches[f"{side}_id"])
+		for col in (f"{side}_rank", f"{side}_rank_points"):
+			if col not in matches.columns:
+				matches[col] = pd.Series(pd.NA, index=matches.index, dtype="string")
+		missing = matches[f"{side}_rank"].astype("string").fillna("").str.strip().eq("").to_numpy()
+		for tour, g in (("atp", "M"), ("wta", "W")):
+			sel = np.flatnonzero(missing & gender.eq(g).to_numpy())
+			if not len(sel) or tour not in rankings:
+				continue
+			rank, points = rankings[tour].lookup(ids[sel], dates[sel])
+			ranked = rank >= 0
+			rows = matches.index[sel[ranked]]
+			matches.loc[rows, f"{side}_rank"] = pd.Series(rank[ranked], index=rows).astype("string")
+			has_points = points[ranked] >= 0
+			matches.loc[rows[has_points], f"{side}_rank_points"] = pd.Series(points[ranked][has_points], index=rows[has_points]).astype("string")
+	return matches
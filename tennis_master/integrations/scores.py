@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+MAX_SETS = 5
+
+# one set: "6-4", "7-6(4)", "7-6(7-4)" or a match tiebreak "[10-8]"
+_SET = r"(?:\s*(\[)?(\d{1,2})-(\d{1,2})(?:\((\d{1,2})(?:-(\d{1,2}))?\))?\]?)?"
+SCORE_PATTERN = re.compile(r"^" + _SET * MAX_SETS)
+_RETIRED = re.compile(r"\bRET\b|\bRet\.?|Retired", re.IGNORECASE)
+_WALKOVER = re.compile(r"W/O|\bWO\b|Walkover", re.IGNORECASE)
+_DEFAULT = re.compile(r"\bDEF\b|\bDef\.?|Default", re.IGNORECASE)
+
+SCORE_COLUMNS: List[str] = (
+	[f"set{i}_{side}" for i in range(1, MAX_SETS + 1) for side in ("w", "l", "tb_w", "tb_l")]
+	+ ["sets_w", "sets_l", "games_w", "games_l", "total_games", "is_retirement", "is_walkover", "is_default"]
+)
+
+
+def _parse_unique(scores: pd.Series) -> pd.DataFrame:
+	"""Parse distinct score strings; games and tiebreak points are from the match winner's side."""
+	parts = scores.str.extract(SCORE_PATTERN)
+	out = {}
+	games_w = np.zeros(len(scores), dtype=np.int64)
+	games_l = np.zeros(len(scores), dtype=np.int64)
+	sets_w = np.zeros(len(scores), dtype=np.int64)
+	sets_l = np.zeros(len(scores), dtype=np.int64)
+	for i in range(MAX_SETS):
+		bracket, a, b, tb1, tb2 = (parts[5 * i + k] for k in range(5))
+		a = pd.to_numeric(a).to_numpy("float64")
+		b = pd.to_numeric(b).to_numpy("float64")
+		tb1 = pd.to_numeric(tb1).to_numpy("float64")
+		tb2 = pd.to_numeric(tb2).to_numpy("float64")
+		is_match_tb = bracket.notna().to_numpy()
+		won = a > b
+		# "7-6(4)": the bracketed number is the set loser's tiebreak points;
+		# "7-6(7-4)" spells out both sides from the match winner's perspective
+		short_tb = ~np.isnan(tb1) & np.isnan(tb2)
+		loser_pts = np.maximum(7, tb1 + 2)
+		tb_w = np.where(short_tb, np.where(won, loser_pts, tb1), tb1)
+		tb_l = np.where(short_tb, np.where(won, tb1, loser_pts), tb2)
+		# a match tiebreak counts as a 1-0 set, its points go to the tiebreak columns
+		tb_w = np.where(is_match_tb, a, tb_w)
+		tb_l = np.where(is_match_tb, b, tb_l)
+		set_w = np.where(is_match_tb, won.astype("float64"), a)
+		set_l = np.where(is_match_tb, (~won & ~np.isnan(a)).astype("float64"), b)
+		set_w = np.where(np.isnan(a), np.nan, set_w)
+		set_l = np.where(np.isnan(a), np.nan, set_l)
+		out[f"set{i + 1}_w"] = set_w
+		out[f"set{i + 1}_l"] = set_l
+		out[f"set{i + 1}_tb_w"] = tb_w
+		out[f"set{i + 1}_tb_l"] = tb_l
+		games_w += np.nan_to_num(set_w).astype(np.int64)
+		games_l += np.nan_to_num(set_l).astype(np.int64)
+		# sets still in progress at a retirement count for nobody
+		complete = ~np.isnan(a) & (is_match_tb | (np.maximum(a, b) >= 6) & (np.abs(a - b) >= 2) | (np.maximum(a, b) == 7))
+		sets_w += (complete & won).astype(np.int64)
+		sets_l += (complete & (a < b)).astype(np.int64)
+	parsed = pd.DataFrame(out, index=scores.index)
+	for col in parsed.columns:
+		parsed[col] = parsed[col].astype("UInt8")
+	has_sets = parsed["set1_w"].notna().to_numpy()
+	parsed["sets_w"] = pd.array(np.where(has_sets, sets_w, 0), dtype="UInt8")
+	parsed["sets_l"] = pd.array(np.where(has_sets, sets_l, 0), dtype="UInt8")
+	parsed["games_w"] = pd.array(games_w, dtype="UInt16")
+	parsed["games_l"] = pd.array(games_l, dtype="UInt16")
+	parsed["total_games"] = pd.array(games_w + games_l, dtype="UInt16")
+	for col in ("sets_w", "sets_l", "games_w", "games_l", "total_games"):
+		parsed.loc[~has_sets, col] = pd.NA
+	parsed["is_retirement"] = scores.str.contains(_RETIRED).astype("boolean")
+	parsed["is_walkover"] = scores.str.contains(_WALKOVER).astype("boolean")
+	parsed["is_default"] = scores.str.contains(_DEFAULT).astype("boolean")
+	return parsed[SCORE_COLUMNS]
+
+
+def parse_scores(df: pd.DataFrame) -> pd.DataFrame:
+	"""Add typed per-set games, tiebreak points, totals and retirement/walkover/default flags from `score`."""
+	if df.empty or "score" not in df.columns:
+		return df
+	# scores repeat heavily ("6-4 6-3"), so only distinct strings go through the regex engine
+	codes, uniques = pd.factorize(df["score"].astype("string").str.strip(), use_na_sentinel=True)
+	parsed = _parse_unique(pd.Series(uniques, dtype="string").fillna(""))
+	# sentinel row for missing scores: no sets, no flags
+	blank = _parse_unique(pd.Series([""], dtype="string"))
+	parsed = pd.concat([parsed, blank], ignore_index=True)
+	taken = parsed.take(np.where(codes < 0, len(parsed) - 1, codes))
+	taken.index = df.index
+	out = df.copy()
+	for col in SCORE_COLUMNS:
+		out[col] = taken[col]
+	return out
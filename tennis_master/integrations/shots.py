@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ..utils import PartitionedCsvWriter, file_in_scope, read_csv_safely
+
+
+# MCP shot notation: a serve ("c" lets, location 4/5/6/0, "+" serve and volley, fault/outcome)
+# followed by rally shots (type letter, court position, direction 1-3, depth 7-9, error, outcome)
+_SERVE = re.compile(r"c*(?P<loc>[0456])?(?P<sv>\+)?(?P<err>[nwdxg!eV])?(?P<out>[*#])?")
+_SHOT = re.compile(
+	r"(?P<type>[fbrsvzopuylmhijktq])(?P<pos>[+\-=])?[;^]*(?P<dir>[0-3])?(?P<depth>[7-9])?[;^]*"
+	r"(?P<err>[nwdx!e])?(?P<out>[*#@])?"
+)
+
+SHOT_TYPES: Dict[str, str] = {
+	"f": "forehand", "b": "backhand", "r": "forehand_slice", "s": "backhand_slice",
+	"v": "forehand_volley", "z": "backhand_volley", "o": "forehand_overhead", "p": "backhand_overhead",
+	"u": "forehand_drop_shot", "y": "backhand_drop_shot", "l": "forehand_lob", "m": "backhand_lob",
+	"h": "forehand_half_volley", "i": "backhand_half_volley", "j": "forehand_swinging_volley",
+	"k": "backhand_swinging_volley", "t": "trick_shot", "q": "unknown",
+}
+SERVE_LOCATIONS = {"4": "wide", "5": "body", "6": "T", "0": "unknown"}
+DIRECTIONS = {"1": "forehand_side", "2": "middle", "3": "backhand_side", "0": "unknown"}
+DEPTHS = {"7": "service_box", "8": "mid_court", "9": "baseline"}
+POSITIONS = {"+": "approach", "-": "net", "=": "baseline"}
+ERROR_TYPES = {"n": "net", "w": "wide", "d": "deep", "x": "wide_and_deep", "g": "foot_fault", "!": "shank", "e": "unknown", "V": "time_violation"}
+OUTCOMES = ("in", "ace", "service_winner", "fault", "winner", "forced_error", "unforced_error", "error")
+_RALLY_OUTCOMES = {"*": "winner", "#": "forced_error", "@": "unforced_error"}
+
+SHOT_EVENT_COLUMNS = [
+	"match_id", "Pt", "serve_no", "shot_no", "player", "shot_type", "serve_location", "serve_and_volley",
+	"position", "direction", "depth", "error_type", "outcome", "unparsed",
+]
+_CATEGORIES = {
+	"shot_type": ["serve", *dict.fromkeys(SHOT_TYPES.values())],
+	"serve_location": list(SERVE_LOCATIONS.values()),
+	"position": list(POSITIONS.values()),
+	"direction": list(DIRECTIONS.values()),
+	"depth": list(DEPTHS.values()),
+	"error_type": list(ERROR_TYPES.values()),
+	"outcome": list(OUTCOMES),
+}
+_POINT_COLUMNS = ["match_id", "Pt", "Svr", "Ret", "1st", "2nd"]
+_CHUNK_POINTS = 50_000
+_PARSE_WORKERS = os.cpu_count() or 1
+
+
+def _tokenize(sequence: str, point: tuple, serve_no: int, server: Optional[int], returner: Optional[int], rows: List[tuple]) -> bool:
+	"""Append one event per shot of a serve sequence to `rows`; returns True when the serve was a fault."""
+	serve = _SERVE.match(sequence)
+	err, out = serve.group("err"), serve.group("out")
+	rest = sequence[serve.end():]
+	rally = list(_SHOT.finditer(rest))
+	# characters no shot pattern covers (unknown codes, typos) are kept on the serve row
+	skipped, pos = [], 0
+	for shot in rally:
+		skipped.append(rest[pos:shot.start()])
+		pos = shot.end()
+	skipped.append(rest[pos:])
+	unparsed = "".join(skipped) or None
+	if err and not rally:
+		outcome = "fault"
+	elif out == "*":
+		outcome = "ace"
+	elif out == "#":
+		outcome = "service_winner"
+	else:
+		outcome = "in"
+	rows.append(point + (serve_no, 1, server, "serve", SERVE_LOCATIONS.get(serve.group("loc")), bool(serve.group("sv")), None, None, None, ERROR_TYPES.get(err), outcome, unparsed))
+	for n, shot in enumerate(rally, start=2):
+		symbol, shot_err = shot.group("out"), shot.group("err")
+		if symbol:
+			shot_outcome = _RALLY_OUTCOMES[symbol]
+		elif shot_err:
+			shot_outcome = "error"
+		else:
+			shot_outcome = "in"
+		rows.append(point + (
+			serve_no, n, returner if n % 2 == 0 else server, SHOT_TYPES[shot.group("type")], None, None,
+			POSITIONS.get(shot.group("pos")), DIRECTIONS.get(shot.group("dir")), DEPTHS.get(shot.group("depth")),
+			ERROR_TYPES.get(shot_err), shot_outcome, None,
+		))
+	return outcome == "fault"
+
+
+def _as_player(value) -> Optional[int]:
+	try:
+		return int(value)
+	except (TypeError, ValueError):
+		return None
+
+
+def tokenize_points(points: pd.DataFrame) -> pd.DataFrame:
+	"""One row per shot of MCP point rows (match_id, Pt, Svr, Ret, 1st, 2nd), with compact dtypes.
+
+	A serve sequence with characters no shot pattern matched keeps them in `unparsed` on its
+	serve row, so partially parsed rallies can be counted and filtered.
+	"""
+	rows: List[tuple] = []
+	cols = [points[c] if c in points.columns else pd.Series(None, index=points.index) for c in _POINT_COLUMNS]
+	for match_id, pt, svr, ret, first, second in zip(*cols):
+		server, returner = _as_player(svr), _as_player(ret)
+		if isinstance(first, str) and first.strip():
+			faulted = _tokenize(first.strip(), (match_id, pt), 1, server, returner, rows)
+			if faulted and isinstance(second, str) and second.strip():
+				_tokenize(second.strip(), (match_id, pt), 2, server, returner, rows)
+	out = pd.DataFrame.from_records(rows, columns=SHOT_EVENT_COLUMNS)
+	out["match_id"] = out["match_id"].astype("string")
+	out["unparsed"] = out["unparsed"].astype("string")
+	out["Pt"] = pd.to_numeric(out["Pt"], errors="coerce").astype("UInt16")
+	for col in ("serve_no", "shot_no", "player"):
+		out[col] = pd.array(out[col], dtype="UInt8" if col != "shot_no" else "UInt16")
+	out["serve_and_volley"] = out["serve_and_volley"].astype("boolean")
+	for col, categories in _CATEGORIES.items():
+		out[col] = pd.Categorical(out[col], categories=categories)
+	return out
+
+
+def _mcp_point_files(config) -> List[Path]:
+	mcp_dir = config.data_root / "tennis_MatchChartingProject"
+	return [p for p in sorted(mcp_dir.glob("charting-*-points-*.csv")) if file_in_scope(config, p, "mcp")]
+
+
+def build_shot_events(config, out_dir: Path) -> Optional[Path]:
+	"""Tokenize the `1st`/`2nd` notation of all MCP points into `tennis_master_shot_events.csv`.
+
+	Point chunks are parsed on a process pool (the tokenizer is pure Python, so threads would
+	serialize on the GIL) and written in input order while later chunks are still parsing.
+	"""
+	paths = _mcp_point_files(config)
+	if not paths:
+		return None
+	writer = PartitionedCsvWriter(out_dir / "tennis_master_shot_events.csv", getattr(config, "compression", None))
+	chunks = (
+		chunk
+		for p in paths
+		for chunk in read_csv_safely(p, usecols=lambda c: c in _POINT_COLUMNS, dtype="string", chunksize=_CHUNK_POINTS)
+	)
+	if _PARSE_WORKERS == 1:
+		for chunk in chunks:
+			writer.write(tokenize_points(chunk))
+		return writer.path
+	with ProcessPoolExecutor(max_workers=_PARSE_WORKERS) as pool:
+		pending = deque()
+		for chunk in chunks:
+			pending.append(pool.submit(tokenize_points, chunk))
+			# bound the parsed chunks held in memory to a couple per worker
+			if len(pending) >= 2 * _PARSE_WORKERS:
+				writer.write(pending.popleft().result())
+		while pending:
+			writer.write(pending.popleft().result())
+	return writer.path
@@ -2,16 +2,62 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from ..utils import read_csv_safely, normalize_name, stable_id
+from ..utils import PartitionedCsvWriter, file_in_scope, in_scope, read_csv_safely, normalize_name, scope_years, stable_id, write_csv
+from .points import AGGREGATE_COLUMNS, POINT_SIDE_COLUMNS, aggregate_points, normalize_points
+from .shots import build_shot_events
+from .sources import FAMILIES
 
 
 @dataclass
 class BuildConfig:
 	data_root: Path
 	out_dir: Path
+	compression: Optional[str] = None
+
+
+# approximate first day (MMDD) of each slam; slam files only carry the year
+SLAM_START_MMDD = {
+	"ausopen": "0115",
+	"frenchopen": "0525",
+	"wimbledon": "0628",
+	"usopen": "0828",
+}
+
+
+def match_dates(df: pd.DataFrame) -> np.ndarray:
+	"""yyyymmdd of each row's tourney start as int64 (0 when unknown)."""
+	raw = df.get("tourney_date", pd.Series(pd.NA, index=df.index)).astype("string").str.strip().fillna("")
+	full = raw.str.slice(0, 8).where(raw.str.len() >= 8)
+	# Slam rows only carry the year; place them at the usual start of that slam
+	mmdd = df.get("tourney_id", pd.Series(pd.NA, index=df.index)).astype("string").str.lower().map(SLAM_START_MMDD).fillna("0101")
+	year_only = (raw + mmdd).where(raw.str.len() == 4)
+	return pd.to_numeric(full.fillna(year_only), errors="coerce").fillna(0).to_numpy("int64")
+
+
+def _slam_players(df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+	# `winner` is 1/2 (player1/player2) in slam files; fall back to the raw value otherwise
+	winner = df.get("winner", pd.Series(pd.NA, index=df.index, dtype="string")).astype("string").str.strip()
+	p1 = df.get("player1", pd.Series(pd.NA, index=df.index, dtype="string")).astype("string")
+	p2 = df.get("player2", pd.Series(pd.NA, index=df.index, dtype="string")).astype("string")
+	winner_name = p1.where(winner == "1", p2.where(winner == "2", winner))
+	loser_name = p2.where(winner == "1", p1.where(winner == "2", pd.NA))
+	return winner_name, loser_name
+
+
+def _slam_gender(df: pd.DataFrame) -> pd.Series:
+	event = df.get("event_name", pd.Series(pd.NA, index=df.index, dtype="string")).astype("string")
+	match_num = df.get("match_num", pd.Series(pd.NA, index=df.index, dtype="string")).astype("string").str.strip()
+	# match_num encodes the draw in its first digit: 1xxx men's singles, 2xxx women's singles
+	gender = match_num.str[0].map({"1": "M", "2": "W"}).astype("string")
+	from_event = event.str.contains("women|ladies|girls", case=False, regex=True)
+	gender = gender.mask(from_event.fillna(False), "W")
+	gender = gender.mask((~from_event & event.str.contains("men|gentlemen|boys", case=False, regex=True)).fillna(False), "M")
+	return gender
 
 
 def flag_slam_points(config: BuildConfig, matches_df: pd.DataFrame) -> pd.DataFrame:
@@ -22,7 +68,7 @@ def flag_slam_points(config: BuildConfig, matches_df: pd.DataFrame) -> pd.DataFr
 	slam_dir = config.data_root / "tennis_slam_pointbypoint"
 	for p in slam_dir.glob("*-points*.csv"):
 		flags.append(p)
-	if not flags:
+	if not flags or not in_scope(config, source="slam"):
 		matches_df["has_points"] = matches_df.get("has_points", "N")
 		return matches_df
 	# heuristic: mark slams by tourney level if available or by name contains Grand Slam names
@@ -34,60 +80,112 @@ def flag_slam_points(config: BuildConfig, matches_df: pd.DataFrame) -> pd.DataFr
 def flag_mcp_shots(config: BuildConfig, matches_df: pd.DataFrame) -> pd.DataFrame:
 	mcp_dir = config.data_root / "tennis_MatchChartingProject"
 	mcp_points = list(mcp_dir.glob("charting-*-points-*.csv"))
-	if not mcp_points or matches_df.empty:
+	if not mcp_points or matches_df.empty or not in_scope(config, source="mcp"):
 		matches_df["has_shots"] = matches_df.get("has_shots", "N")
 		return matches_df
-	# broad flag: any match potentially in MCP data
-	matches_df["has_shots"] = "Y"
+	# broad flag: any match potentially in MCP data (MCP does not chart futures)
+	charted = matches_df.get("source", pd.Series(pd.NA, index=matches_df.index)).ne("atp_futures").fillna(True)
+	matches_df["has_shots"] = matches_df.get("has_shots", "N")
+	matches_df.loc[charted, "has_shots"] = "Y"
 	return matches_df
 
 
-def union_slam_matches(config: BuildConfig) -> pd.DataFrame:
+def _slam_files(slam_dir: Path, pattern: str, years: Optional[Iterable[int]] = None) -> List[Path]:
+	# slam files are named <year>-<slam>-matches.csv / -points.csv
+	paths = sorted(slam_dir.glob(pattern))
+	if years is None:
+		return paths
+	wanted = {str(y) for y in years}
+	return [p for p in paths if p.name.split("-", 1)[0] in wanted]
+
+
+def _in_tours(config: BuildConfig, gender: pd.Series) -> pd.Series:
+	# slam files mix both draws, so --tours is applied to rows
+	tours = {"M": in_scope(config, tour="atp"), "W": in_scope(config, tour="wta")}
+	return gender.map(tours).fillna(True).astype(bool)
+
+
+def union_slam_matches(config: BuildConfig, years: Optional[Iterable[int]] = None) -> pd.DataFrame:
 	rows = []
-	slam_dir = config.data_root / "tennis_slam_pointbypoint"
-	for p in slam_dir.glob("*-matches*.csv"):
+	if not in_scope(config, source="slam"):
+		return pd.DataFrame()
+	for p in FAMILIES["slam"].paths(config.data_root, scope_years(config, years)):
 		df = read_csv_safely(p)
 		if df.empty:
 			continue
+		winner_name, loser_name = _slam_players(df)
 		keep = pd.DataFrame({
 			"source": "slam_pbp",
 			"tourney_name": df.get("slam", pd.Series(dtype="string")).map(lambda x: normalize_name(x) if pd.notna(x) else ""),
 			"tourney_id": df.get("slam", pd.Series(dtype="string")),
 			"tourney_date": df.get("year", pd.Series(dtype="string")),
 			"match_num": df.get("match_num", pd.Series(dtype="string")),
-			"winner_name": df.get("winner", pd.Series(dtype="string")),
-			"loser_name": pd.Series([pd.NA] * len(df), dtype="string"),
+			"winner_name": winner_name,
+			"loser_name": loser_name,
 			"round": df.get("round", pd.Series(dtype="string")),
 			"best_of": pd.Series([pd.NA] * len(df), dtype="string"),
-			"gender": pd.Series([pd.NA] * len(df), dtype="string"),
+			"gender": _slam_gender(df),
 			"discipline": pd.Series(["singles"] * len(df), dtype="string"),
+			"slam_match_id": df.get("match_id", pd.Series(pd.NA, index=df.index, dtype="string")),
 		})
 		keep["match_id"] = [
 			stable_id(str(r.get("tourney_id", "")), str(r.get("tourney_date", "")), str(r.get("round", "")), str(i))
 			for i, r in keep.iterrows()
 		]
-		rows.append(keep)
+		rows.append(keep[_in_tours(config, keep["gender"])])
 	return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
 
 
-def build_points_outputs(config: BuildConfig, out_dir: Path) -> None:
-	# Concatenate Slam points and MCP points into separate outputs
-	slam_points = []
-	for p in (config.data_root / "tennis_slam_pointbypoint").glob("*-points*.csv"):
+def _slam_match_winners(points_path: Path) -> pd.Series:
+	# slam match_id -> 1/2 from the matches file next to a points file
+	matches_path = points_path.with_name(points_path.name.replace("-points", "-matches"))
+	df = read_csv_safely(matches_path) if matches_path.exists() else pd.DataFrame()
+	if df.empty or "match_id" not in df.columns or "winner" not in df.columns:
+		return pd.Series(dtype="string")
+	return df.drop_duplicates("match_id").set_index("match_id")["winner"].astype("string").str.strip()
+
+
+def build_points_outputs(config: BuildConfig, out_dir: Path, pairs: Optional[pd.DataFrame] = None) -> None:
+	"""Write the typed Slam point stream with its per-match aggregates, and the MCP shots.
+
+	`pairs` (slam_match_id, winner_id, loser_id from the matches output) gives point servers and
+	winners their canonical player ids.
+	"""
+	slam_dir = config.data_root / "tennis_slam_pointbypoint"
+	slam_paths = _slam_files(slam_dir, "*-points*.csv", scope_years(config)) if in_scope(config, source="slam") else []
+	compression = getattr(config, "compression", None)
+	# files stream straight to disk one slam at a time, so the header is the union of their columns
+	columns = ["source"]
+	for p in slam_paths:
+		columns.extend(c for c in read_csv_safely(p, nrows=0).columns if c not in columns)
+	columns.extend(c for c in POINT_SIDE_COLUMNS if c not in columns)
+	points_writer = PartitionedCsvWriter(out_dir / "tennis_master_points.csv", compression)
+	stats_writer = PartitionedCsvWriter(out_dir / "tennis_master_match_point_stats.csv")
+	for p in slam_paths:
 		df = read_csv_safely(p)
 		if not df.empty:
+			# points carry the draw in the match_num part of <year>-<slam>-<match_num>
+			draw = df["match_id"].astype("string").str.rsplit("-", n=1).str[-1].str[0] if "match_id" in df.columns else pd.Series(pd.NA, index=df.index)
+			df = df[_in_tours(config, draw.map({"1": "M", "2": "W"}))]
+			if "match_id" in df.columns:
+				# one file is one slam: normalize and aggregate it before moving on
+				winners = _slam_match_winners(p)
+				df = normalize_points(df, winners, pairs)
+				stats_writer.write(aggregate_points(df, winners, pairs)[AGGREGATE_COLUMNS])
 			df.insert(0, "source", "slam_pbp")
-			slam_points.append(df)
-	if slam_points:
-		pd.concat(slam_points, ignore_index=True).to_csv(out_dir / "tennis_master_points.csv", index=False)
+			points_writer.write(df.reindex(columns=columns))
 
 	mcp_points = []
-	for p in (config.data_root / "tennis_MatchChartingProject").glob("charting-*-points-*.csv"):
+	for p in sorted((config.data_root / "tennis_MatchChartingProject").glob("charting-*-points-*.csv")):
+		if not file_in_scope(config, p, "mcp"):
+			continue
 		df = read_csv_safely(p)
 		if not df.empty:
 			df.insert(0, "source", "mcp")
 			mcp_points.append(df)
 	if mcp_points:
-		pd.concat(mcp_points, ignore_index=True).to_csv(out_dir / "tennis_master_shots.csv", index=False)
+		write_csv(pd.concat(mcp_points, ignore_index=True), out_dir / "tennis_master_shots.csv", compression)
+	# one row per shot, parsed from the 1st/2nd notation the raw shots file keeps as text
+	build_shot_events(config, out_dir)
 
 
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from ..utils import in_scope, read_csv_safely, scope_years
+
+
+@dataclass(frozen=True)
+class LevelMap:
+	"""Raw tourney_level code -> readable level of one source.
+
+	With `numeric_prefix`, all-digit codes of at least `numeric_min` are prize money in $K
+	("ITF" -> "ITF $25K"). Other unlisted codes become `other`, or stay as they are when None.
+	"""
+	codes: Dict[str, str]
+	numeric_prefix: Optional[str] = None
+	numeric_min: int = 0
+	other: Optional[str] = None
+
+	def apply(self, level: pd.Series) -> pd.Series:
+		out = level.map(self.codes).astype("string")
+		if self.numeric_prefix:
+			amount = pd.to_numeric(level.where(level.str.fullmatch(r"\d+").fillna(False)), errors="coerce")
+			prize = amount.ge(self.numeric_min).fillna(False) & out.isna()
+			out = out.mask(prize, self.numeric_prefix + " $" + amount.astype("Int64").astype("string") + "K")
+		fallback = level if self.other is None else pd.Series(self.other, index=level.index, dtype="string")
+		return out.fillna(fallback)
+
+
+ATP_LEVELS = LevelMap({
+	"G": "Grand Slam", "M": "ATP Tour", "A": "ATP Tour", "S": "Futures", "C": "Challengers", "D": "Davis Cup",
+	"F": "Tour Finals", "O": "Other", "E": "Exhibition", "J": "Juniors", "CC": "Challengers",
+})
+WTA_LEVELS = LevelMap({
+	"G": "Grand Slam", "P": "WTA Tour", "PM": "WTA Tour", "I": "International", "C": "Challengers", "D": "BJK Cup",
+	"W": "Tour Finals", "E": "Exhibition", "J": "Juniors", "CC": "Challengers",
+	"T1": "WTA Tour", "T2": "WTA Tour", "T3": "WTA Tour", "T4": "WTA Tour", "T5": "WTA Tour",
+}, numeric_prefix="ITF", numeric_min=10)
+FUTURES_LEVELS = LevelMap({"S": "Futures"}, numeric_prefix="Futures", other="Futures")
+SLAM_LEVELS = LevelMap({"G": "Grand Slam"}, other="Unknown")
+
+
+@dataclass(frozen=True)
+class SourceFamily:
+	"""One family of source files: where they live, which years exist and how rows are labelled.
+
+	`pattern` is formatted with the year and globbed under `directory`; `scope` is the
+	--sources name that enables the family and `tour` its --tours name (None: both draws).
+	"""
+	name: str
+	directory: str
+	pattern: str
+	years: range
+	source: str
+	scope: str
+	tour: Optional[str]
+	levels: LevelMap
+
+	@property
+	def gender(self) -> Optional[str]:
+		return {"atp": "M", "wta": "W"}.get(self.tour)
+
+	def paths(self, root: Path, years: Optional[Iterable[int]] = None) -> List[Path]:
+		base = root / self.directory
+		found: List[Path] = []
+		for year in (self.years if years is None else [y for y in years if y in self.years]):
+			found.extend(sorted(base.glob(self.pattern.format(year=year))))
+		return found
+
+
+MATCH_YEARS = range(1968, 2026)
+FUTURES_YEARS = range(1991, 2025)
+
+SOURCE_REGISTRY: Tuple[SourceFamily, ...] = (
+	SourceFamily("atp_main", "tennis_atp", "atp_matches_{year}.csv", MATCH_YEARS, "atp", "main", "atp", ATP_LEVELS),
+	SourceFamily("qual_chall", "tennis_atp", "atp_matches_qual_chall_{year}.csv", MATCH_YEARS, "atp", "qual", "atp", ATP_LEVELS),
+	SourceFamily("futures", "tennis_atp", "atp_matches_futures_{year}.csv", FUTURES_YEARS, "atp_futures", "futures", "atp", FUTURES_LEVELS),
+	SourceFamily("wta_main", "tennis_wta", "wta_matches_{year}.csv", MATCH_YEARS, "wta", "main", "wta", WTA_LEVELS),
+	SourceFamily("qual_itf", "tennis_wta", "wta_matches_qual_itf_{year}.csv", MATCH_YEARS, "wta", "qual", "wta", WTA_LEVELS),
+	# slam rows have their own layout and are reshaped by union_slam_matches
+	SourceFamily("slam", "tennis_slam_pointbypoint", "{year}-*-matches*.csv", MATCH_YEARS, "slam_pbp", "slam", None, SLAM_LEVELS),
+)
+FAMILIES: Dict[str, SourceFamily] = {f.name: f for f in SOURCE_REGISTRY}
+
+# families read by the generic loader: one ATP/WTA-layout file per tour and year
+TOUR_FAMILIES: Tuple[str, ...] = ("atp_main", "qual_chall", "wta_main", "qual_itf")
+TOUR_FAMILIES_WITH_FUTURES: Tuple[str, ...] = ("atp_main", "qual_chall", "futures", "wta_main", "qual_itf")
+
+# tourney_level normalization per source label; MCP only ever names slams
+SOURCE_LEVELS: Dict[str, LevelMap] = {f.source: f.levels for f in SOURCE_REGISTRY}
+SOURCE_LEVELS["mcp"] = SLAM_LEVELS
+
+_READ_THREADS = min(8, os.cpu_count() or 1)
+
+
+def _read_family_file(family: SourceFamily, path: Path) -> pd.DataFrame:
+	df = read_csv_safely(path)
+	df["discipline"] = "singles"
+	df["source"] = family.source
+	df["gender"] = family.gender
+	return df
+
+
+def load_sources(config, years: Optional[Iterable[int]] = None, families: Iterable[str] = TOUR_FAMILIES) -> pd.DataFrame:
+	"""Raw rows of every enabled family for `years`, each file read once on a thread pool.
+
+	Families outside the build's --tours/--sources scope are skipped; rows keep registry order
+	(tour, then year, then family) and carry their `source`, `gender` and `discipline`.
+	"""
+	years = scope_years(config, years)
+	enabled = [FAMILIES[name] for name in families if in_scope(config, tour=FAMILIES[name].tour, source=FAMILIES[name].scope)]
+	tasks = []
+	for tour in ("atp", "wta"):
+		tour_families = [f for f in enabled if f.tour == tour]
+		for year in sorted(set().union(*(f.years for f in tour_families))) if tour_families else []:
+			if years is not None and year not in years:
+				continue
+			for family in tour_families:
+				tasks.extend((family, path) for path in family.paths(config.data_root, [year]))
+	if not tasks:
+		return pd.DataFrame()
+	with ThreadPoolExecutor(max_workers=_READ_THREADS) as pool:
+		frames = list(pool.map(lambda task: _read_family_file(*task), tasks))
+	return pd.concat(frames, ignore_index=True)
+
+
+def normalize_levels(level: pd.Series, source: pd.Series) -> pd.Series:
+	"""Readable tourney_level per row from each source's registry LevelMap, column-wise."""
+	raw = level.astype("string")
+	stripped = raw.str.strip()
+	out = stripped.copy()
+	source = source.astype("string").fillna("")
+	for label, levels in SOURCE_LEVELS.items():
+		sel = source.eq(label).to_numpy()
+		if sel.any():
+			out[sel] = levels.apply(stripped[sel])
+	return out.mask(raw.isna() | raw.eq(""), "Unknown")
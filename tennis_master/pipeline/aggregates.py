@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from ..dimensions.players import canonical_player_ids
+from ..utils import FILE_YEAR, output_dir, scope_years
+
+
+@dataclass
+class BuildConfig:
+	data_root: Path
+	out_dir: Path
+	compression: Optional[str] = None
+
+
+H2H_KEYS = ["gender", "player_a", "player_b", "surface", "tourney_level"]
+H2H_COLUMNS = H2H_KEYS + ["matches", "a_wins", "b_wins", "first_meeting", "last_meeting", "last_winner_id"]
+SEASON_KEYS = ["gender", "player_id", "event_year", "surface", "tourney_level"]
+# summed per player and season from the player's side of each match
+SEASON_STATS = {
+	"aces": "ace", "double_faults": "df", "serve_points": "svpt", "first_serves_in": "1stIn",
+	"first_serve_points_won": "1stWon", "second_serve_points_won": "2ndWon", "service_games": "SvGms",
+	"break_points_saved": "bpSaved", "break_points_faced": "bpFaced",
+}
+SEASON_COLUMNS = SEASON_KEYS + ["matches", "wins", "losses", *SEASON_STATS, "minutes"]
+H2H_YEAR_COLUMNS = ["event_year"] + H2H_COLUMNS
+H2H_COUNTS = ["matches", "a_wins", "b_wins"]
+SEASON_SUMS = [c for c in SEASON_COLUMNS if c not in SEASON_KEYS]
+# sidecar grain: the match file partition a row came from, so scoped builds carry over by file
+H2H_STATE_COLUMNS = [FILE_YEAR] + H2H_YEAR_COLUMNS
+SEASON_STATE_COLUMNS = [FILE_YEAR] + SEASON_COLUMNS
+_GENDER_TOURS = {"M": "atp", "W": "wta"}
+
+_log = logging.getLogger(__name__)
+
+
+def _text(df: pd.DataFrame, col: str) -> pd.Series:
+	return df.get(col, pd.Series(pd.NA, index=df.index)).astype("string")
+
+
+def _counts(df: pd.DataFrame, counts: List[str]) -> pd.DataFrame:
+	out = df.copy()
+	for col in counts:
+		out[col] = pd.to_numeric(out[col], errors="coerce").astype("Int64")
+	return out
+
+
+def _counted(matches: pd.DataFrame) -> pd.DataFrame:
+	"""Rows that count towards records: both players known, not a walkover."""
+	walkover = _text(matches, "is_walkover").str.lower().eq("true").fillna(False)
+	known = _text(matches, "winner_id").notna() & _text(matches, "loser_id").notna()
+	return matches[known & ~walkover]
+
+
+def h2h_partials(matches: pd.DataFrame) -> pd.DataFrame:
+	"""Year-grain head-to-head rows of `matches`: the pair is ordered so that player_a < player_b."""
+	rows = _counted(matches)
+	w, l = _text(rows, "winner_id"), _text(rows, "loser_id")
+	a_won = (w < l).to_numpy()
+	date = _text(rows, "event_date").replace("", pd.NA)
+	parts = pd.DataFrame({
+		"event_year": _text(rows, "event_year"),
+		"gender": _text(rows, "gender"),
+		"player_a": w.where(a_won, l),
+		"player_b": l.where(a_won, w),
+		"surface": _text(rows, "surface"),
+		"tourney_level": _text(rows, "tourney_level"),
+		"matches": 1,
+		"a_wins": a_won.astype("int64"),
+		"b_wins": (~a_won).astype("int64"),
+		"first_meeting": date,
+		"last_meeting": date,
+		"last_winner_id": w,
+	})
+	return _roll_h2h(parts, ["event_year"] + H2H_KEYS)
+
+
+def _roll_h2h(parts: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+	"""Sum h2h rows over `keys`; first/last meeting and the last winner follow the meeting dates."""
+	if parts.empty:
+		return pd.DataFrame(columns=keys + H2H_COLUMNS[len(H2H_KEYS):])
+	parts = parts.sort_values("last_meeting", kind="stable", na_position="first")
+	out = parts.groupby(keys, sort=True, dropna=False).agg(
+		matches=("matches", "sum"),
+		a_wins=("a_wins", "sum"),
+		b_wins=("b_wins", "sum"),
+		first_meeting=("first_meeting", "min"),
+		last_meeting=("last_meeting", "last"),
+		last_winner_id=("last_winner_id", "last"),
+	)
+	return out.reset_index()
+
+
+def season_partials(matches: pd.DataFrame) -> pd.DataFrame:
+	"""Per player, season, surface and level: record and summed serve stats, winners and losers in one frame."""
+	rows = _counted(matches)
+	sides = []
+	for side, prefix, won in (("winner", "w", 1), ("loser", "l", 0)):
+		part = pd.DataFrame({
+			"gender": _text(rows, "gender"),
+			"player_id": _text(rows, f"{side}_id"),
+			"event_year": _text(rows, "event_year"),
+			"surface": _text(rows, "surface"),
+			"tourney_level": _text(rows, "tourney_level"),
+			"matches": 1,
+			"wins": won,
+			"losses": 1 - won,
+		})
+		for name, stat in SEASON_STATS.items():
+			part[name] = pd.to_numeric(rows.get(f"{prefix}_{stat}"), errors="coerce")
+		part["minutes"] = pd.to_numeric(rows.get("minutes"), errors="coerce")
+		sides.append(part)
+	if rows.empty:
+		return pd.DataFrame(columns=SEASON_COLUMNS)
+	return _roll_season(pd.concat(sides, ignore_index=True))
+
+
+def _roll_season(parts: pd.DataFrame, keys: List[str] = SEASON_KEYS) -> pd.DataFrame:
+	out = parts.groupby(keys, sort=True, dropna=False).agg(
+		**{c: (c, "sum") for c in SEASON_SUMS},
+		**{f"_n_{c}": (c, "count") for c in SEASON_SUMS},
+	)
+	# a stat none of the player's matches recorded stays empty instead of summing to 0
+	for col in SEASON_SUMS:
+		out[col] = out[col].mask(out.pop(f"_n_{col}") == 0).astype("Int64")
+	return out.reset_index()
+
+
+class AggregateTracker:
+	"""Materialized `h2h.csv` and `player_season.csv`, maintained incrementally across builds.
+
+	Both tables are aggregated at season grain from each partition as it is written, so a
+	build only aggregates the rows it rebuilt. Players are keyed by `player_canonical_id` from
+	`players_dim`, so one player's ATP, futures and Slam rows count together. The partials are
+	kept per match file year in `h2h_state.csv` / `player_season_state.csv`; `finish()` merges
+	them with the previous build's partials from files outside its --years/--tours scope and
+	rolls them up to seasons and, for the head-to-heads, over all seasons.
+	"""
+
+	def __init__(self, config: BuildConfig, players_dim: pd.DataFrame, suffix: str = ""):
+		self.config = config
+		self.players_dim = players_dim
+		out_dir = config.out_dir
+		self.h2h_path = out_dir / f"h2h{suffix}.csv"
+		self.h2h_years_path = out_dir / f"h2h_by_year{suffix}.csv"
+		self.season_path = out_dir / f"player_season{suffix}.csv"
+		self.h2h_state_path = out_dir / f"h2h_state{suffix}.csv"
+		self.season_state_path = out_dir / f"player_season_state{suffix}.csv"
+		# a scoped build merges with the full build's partials but writes under scoped/
+		self.out_dir = output_dir(config)
+		self.h2h: List[pd.DataFrame] = []
+		self.seasons: List[pd.DataFrame] = []
+
+	def add(self, matches: pd.DataFrame, file_years: Optional[pd.Series] = None) -> None:
+		"""Aggregate one written partition; `file_years` is each row's match file year (FILE_YEAR)."""
+		if matches.empty:
+			return
+		genders = matches.get("gender", pd.Series(pd.NA, index=matches.index))
+		matches = matches.assign(**{
+			col: canonical_player_ids(matches[col], genders, self.players_dim)
+			for col in ("winner_id", "loser_id") if col in matches.columns
+		})
+		years = file_years if file_years is not None else _text(matches, "event_year")
+		for year, rows in matches.groupby(years.astype("string").fillna("").to_numpy(), sort=False):
+			self.h2h.append(h2h_partials(rows).assign(**{FILE_YEAR: year}))
+			self.seasons.append(season_partials(rows).assign(**{FILE_YEAR: year}))
+
+	def _outside(self, partials: pd.DataFrame) -> pd.Series:
+		"""Partials from match files outside a scoped build's --years/--tours."""
+		outside = pd.Series(False, index=partials.index)
+		years = scope_years(self.config)
+		if years is not None:
+			outside |= ~partials[FILE_YEAR].isin([str(y) for y in years])
+		tours = getattr(self.config, "tours", None)
+		if tours is not None:
+			outside |= ~partials["gender"].map(_GENDER_TOURS).isin(tours)
+		return outside
+
+	def _merged(self, state_path: Path, table_path: Path, fresh: List[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+		"""This build's partials plus the previous build's partials from files outside the scope."""
+		new = pd.concat(fresh, ignore_index=True).astype("string") if fresh else pd.DataFrame(columns=columns, dtype="string")
+		if state_path.exists():
+			previous = pd.read_csv(state_path, dtype="string")
+		elif table_path.exists():
+			# tables written before the state sidecar; event_year is the closest guess at the file
+			previous = pd.read_csv(table_path, dtype="string")
+			previous[FILE_YEAR] = previous["event_year"]
+		else:
+			return new
+		return pd.concat([previous[self._outside(previous)], new], ignore_index=True)
+
+	def finish(self) -> None:
+		"""Merge the new and carried-over partials and write the state, season and head-to-head tables."""
+		if getattr(self.config, "sources", None) is not None:
+			# seasons mix main and qualifying rows, which a --sources build only partly rebuilds
+			_log.warning("--sources build: %s and %s were not rebuilt", self.h2h_path.name, self.season_path.name)
+			return
+		h2h_state = self._merged(self.h2h_state_path, self.h2h_years_path, self.h2h, H2H_STATE_COLUMNS)
+		season_state = self._merged(self.season_state_path, self.season_path, self.seasons, SEASON_STATE_COLUMNS)
+		h2h_state = _roll_h2h(_counts(h2h_state, H2H_COUNTS), [FILE_YEAR, "event_year"] + H2H_KEYS)
+		season_state = _roll_season(_counts(season_state, SEASON_SUMS), [FILE_YEAR] + SEASON_KEYS)
+		h2h_state[H2H_STATE_COLUMNS].to_csv(self.out_dir / self.h2h_state_path.name, index=False)
+		season_state[SEASON_STATE_COLUMNS].to_csv(self.out_dir / self.season_state_path.name, index=False)
+		# a season split across file partitions (event_year follows tourney_date) is merged here
+		h2h_years = _roll_h2h(h2h_state, ["event_year"] + H2H_KEYS)
+		seasons = _roll_season(season_state)
+		h2h_years[H2H_YEAR_COLUMNS].to_csv(self.out_dir / self.h2h_years_path.name, index=False)
+		seasons[SEASON_COLUMNS].to_csv(self.out_dir / self.season_path.name, index=False)
+		_roll_h2h(h2h_years, H2H_KEYS)[H2H_COLUMNS].to_csv(self.out_dir / self.h2h_path.name, index=False)
@@ -3,50 +3,129 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterable, Optional, Sequence, Tuple
 
-from ..staging.manifest import build_manifest
-from ..dimensions.players import build_players
-from ..dimensions.tournaments import build_tournaments
-from ..integrations.matches import integrate_atp_wta, enrich_match_fields, normalize_tourney_level
+from ..staging.manifest import build_manifest, detect_schema_drift, load_previous_manifest
+from ..staging.validation import ValidationReport
+from ..dimensions.players import build_players, resolve_player_ids
+from ..dimensions.tournaments import TournamentIndex, build_tournaments, canonical_tourney_ids
+from ..integrations.matches import integrate_matches, enrich_match_fields, normalize_tourney_level, match_output_columns
 from ..integrations.slam_mcp_flags import flag_slam_points, flag_mcp_shots, union_slam_matches, build_points_outputs
+from ..integrations.points import slam_pairs
+from ..integrations.rankings import RankingTable, RankingWindow, load_rankings, attach_rankings
+from ..integrations.scores import parse_scores
+from ..integrations.sources import MATCH_YEARS, TOUR_FAMILIES
+from ..integrations.dedup import dedup_matches
+from ..utils import FILE_YEAR, PartitionedCsvWriter, clear_success_marker, output_dir, scope_years, write_success_marker
+from .aggregates import AggregateTracker
+from .deltas import DeltaTracker
 
 
 @dataclass
 class BuildConfig:
 	data_root: Path
 	out_dir: Path
+	strict_validation: bool = False
+	low_memory: bool = False
+	compression: Optional[str] = None
+	years: Optional[Tuple[int, ...]] = None
+	tours: Optional[frozenset] = None
+	sources: Optional[frozenset] = None
 
 
-def build_all(data_root: Path, out_dir: Path) -> None:
-	config = BuildConfig(data_root=data_root, out_dir=out_dir)
+def load_match_partition(config: BuildConfig, year: int, reports: Sequence[ValidationReport], families: Iterable[str] = TOUR_FAMILIES, tourneys: Optional[TournamentIndex] = None) -> pd.DataFrame:
+	"""Raw rows of the registry `families` plus Slam rows of the `year` files, before dedup and enrichment.
+
+	Rows carry the partition year in FILE_YEAR. With `tourneys`, rows whose tourney_id is not a
+	tour id get the canonical one by name and year.
+	"""
+	years = [year]
+	matches = integrate_matches(config, years=years, reports=reports, families=families)
+	matches = flag_slam_points(config, matches)
+	matches = flag_mcp_shots(config, matches)
+	# union Slam singles matches as base rows
+	slam_rows = union_slam_matches(config, years=years)
+	if not slam_rows.empty:
+		matches = pd.concat([matches, slam_rows], ignore_index=True)
+	matches[FILE_YEAR] = year
+	return canonical_tourney_ids(matches, tourneys)
+
+
+def finish_matches(matches: pd.DataFrame, players_dim: pd.DataFrame, rankings: Dict[str, RankingTable]) -> pd.DataFrame:
+	"""Row-local stages from dedup to level normalization; safe to run per year partition.
+
+	Returns the output columns plus FILE_YEAR, which callers hand to the trackers and drop before writing.
+	"""
+	# Slam rows mostly restate ATP/WTA slam matches; keep one row per match
+	matches = dedup_matches(matches)
+	# rank/points as of the match date for rows whose source left them empty
+	matches = resolve_player_ids(matches, players_dim)
+	matches = attach_rankings(matches, rankings)
+	matches = parse_scores(matches)
+	matches = enrich_match_fields(matches)
+	matches = normalize_tourney_level(matches)
+	# fixed columns so partitions can be appended to one file
+	return matches.reindex(columns=[*match_output_columns(), FILE_YEAR])
+
+
+def build_all(data_root: Path, out_dir: Path, strict_validation: bool = False, low_memory: bool = False, compression: Optional[str] = None, years: Optional[Tuple[int, ...]] = None, tours: Optional[frozenset] = None, sources: Optional[frozenset] = None) -> Path:
+	config = BuildConfig(data_root=data_root, out_dir=out_dir, strict_validation=strict_validation, low_memory=low_memory, compression=compression, years=years, tours=tours, sources=sources)
+	# a scoped build writes its slice to <out_dir>/scoped and leaves the full outputs alone
+	out_dir = output_dir(config)
 	out_dir.mkdir(parents=True, exist_ok=True)
+	# readers (e.g. `serve`) only trust out_dir once the marker is back
+	clear_success_marker(out_dir)
 	# 1) Inventory datasets
-	manifest_df = build_manifest(config)
+	previous_manifest = load_previous_manifest(out_dir)
+	manifest_df = build_manifest(config, previous=previous_manifest)
 	manifest_path = out_dir / "manifest.csv"
 	manifest_df.to_csv(manifest_path, index=False)
+	detect_schema_drift(manifest_df, previous_manifest).to_csv(out_dir / "schema_drift.csv", index=False)
 	# 2) Dimensions
 	players_dim, player_aliases = build_players(config)
 	players_dim.to_csv(out_dir / "dim_players.csv", index=False)
 	player_aliases.to_csv(out_dir / "player_aliases.csv", index=False)
 
-	tourneys_dim, tourney_aliases = build_tournaments(config)
+	tourneys_dim, tourney_aliases, tourneys = build_tournaments(config)
 	tourneys_dim.to_csv(out_dir / "dim_tournaments.csv", index=False)
 	tourney_aliases.to_csv(out_dir / "tournament_aliases.csv", index=False)
 
-	# 3) Integrate ATP+WTA matches
-	matches = integrate_atp_wta(config)
-	matches = flag_slam_points(config, matches)
-	matches = flag_mcp_shots(config, matches)
-	# union Slam singles matches as base rows
-	slam_rows = union_slam_matches(config)
-	if not slam_rows.empty:
-		matches = pd.concat([matches, slam_rows], ignore_index=True)
-	matches = enrich_match_fields(matches)
-	matches = normalize_tourney_level(matches)
-	matches.to_csv(out_dir / "tennis_master_matches.csv", index=False)
+	# 3) Integrate ATP+WTA+Slam matches, year by year so both modes write rows in the same order
+	report = ValidationReport(config)
+	writer = PartitionedCsvWriter(out_dir / "tennis_master_matches.csv", config.compression)
+	# inserted/updated/deleted rows against the previous build in out_dir
+	deltas = DeltaTracker(config)
+	# h2h / player_season tables, aggregated from the partitions this build writes
+	aggregates = AggregateTracker(config, players_dim)
 
-	# build points and shots outputs
-	build_points_outputs(config, out_dir)
+	# canonical player pair of each slam match, for the points stage
+	pairs = []
 
+	def _write(matches: pd.DataFrame) -> None:
+		file_years = matches.pop(FILE_YEAR)
+		writer.write(matches)
+		deltas.add(matches, file_years)
+		aggregates.add(matches, file_years)
+		slam = slam_pairs(matches)
+		# most years hold no Slam rows; concatenating their empty frames is deprecated in pandas
+		if not slam.empty:
+			pairs.append(slam)
 
+	if config.low_memory:
+		# peak memory is bounded by the largest single year and the ranking files around it
+		window = RankingWindow(config)
+		for year in scope_years(config, MATCH_YEARS):
+			_write(finish_matches(load_match_partition(config, year, [report], tourneys=tourneys), players_dim, window.tables([year])))
+	else:
+		# the same per-year loads, held together and finished in one call
+		rankings = load_rankings(config)
+		raw = pd.concat([load_match_partition(config, year, [report], tourneys=tourneys) for year in scope_years(config, MATCH_YEARS)], ignore_index=True)
+		_write(finish_matches(raw, players_dim, rankings))
+	report.write()
+	deltas.finish()
+	aggregates.finish()
+
+	# build points and shots outputs
+	build_points_outputs(config, out_dir, pd.concat(pairs, ignore_index=True) if pairs else None)
+	write_success_marker(out_dir)
+	return out_dir
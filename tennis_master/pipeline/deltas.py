@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..utils import FILE_YEAR, PartitionedCsvWriter, output_dir, scope_years
+
+
+@dataclass
+class BuildConfig:
+	data_root: Path
+	out_dir: Path
+	compression: Optional[str] = None
+
+
+STATE_COLUMNS = ["match_id", "row_hash", "event_year", FILE_YEAR, "gender"]
+_GENDER_TOURS = {"M": "atp", "W": "wta"}
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+	"""uint64 content hash of each row as written (all columns, as text)."""
+	if df.empty:
+		return np.empty(0, dtype=np.uint64)
+	return pd.util.hash_pandas_object(df.astype("string"), index=False).to_numpy()
+
+
+class DeltaTracker:
+	"""Change-data-capture of one matches output against the previous build in out_dir.
+
+	Rows are keyed by `match_id` and compared by content hash. Partitions are added as they are
+	written; inserted/updated rows stream to `<stem>_inserted.csv` / `<stem>_updated.csv`, and
+	`finish()` writes `<stem>_deleted.csv`, `<stem>_delta_summary.csv` and the new
+	`<stem>_state.csv` sidecar that the next build compares against.
+	"""
+
+	def __init__(self, config: BuildConfig, stem: str = "tennis_master_matches"):
+		self.config = config
+		self.stem = stem
+		compression = getattr(config, "compression", None)
+		self.state_path = config.out_dir / f"{stem}_state.csv"
+		self.previous = self._load_state()
+		# a scoped build compares against the full build's state but writes under scoped/
+		self.out_dir = output_dir(config)
+		self.inserted = PartitionedCsvWriter(self.out_dir / f"{stem}_inserted.csv", compression)
+		self.updated = PartitionedCsvWriter(self.out_dir / f"{stem}_updated.csv", compression)
+		self.deleted = PartitionedCsvWriter(self.out_dir / f"{stem}_deleted.csv", compression)
+		self.states: List[pd.DataFrame] = []
+		self.unchanged = 0
+
+	def _load_state(self) -> pd.Series:
+		if not self.state_path.exists():
+			return pd.Series([], index=pd.Index([], dtype="string"), dtype="uint64")
+		state = pd.read_csv(self.state_path, dtype={"match_id": "string", "row_hash": "uint64"}, usecols=["match_id", "row_hash"])
+		state = state.drop_duplicates("match_id", keep="last")
+		return pd.Series(state["row_hash"].to_numpy(), index=pd.Index(state["match_id"]))
+
+	def add(self, df: pd.DataFrame, file_years: Optional[pd.Series] = None) -> None:
+		"""Compare one written partition with the previous build and stream its inserts/updates.
+
+		`file_years` is the match file year each row was loaded from (FILE_YEAR).
+		"""
+		if df.empty:
+			return
+		ids = df["match_id"].astype("string")
+		hashes = row_hashes(df)
+		# positional lookup keeps the uint64 hashes exact (a mapped Series would go through float)
+		pos = self.previous.index.get_indexer(ids)
+		is_new = pos < 0
+		previous = np.append(self.previous.to_numpy(), np.uint64(0))
+		changed = ~is_new & (previous[pos] != hashes)
+		self.inserted.write(df[is_new])
+		self.updated.write(df[changed])
+		self.unchanged += int((~is_new & ~changed).sum())
+		self.states.append(pd.DataFrame({
+			"match_id": ids.to_numpy(),
+			"row_hash": hashes,
+			"event_year": df.get("event_year", pd.Series(pd.NA, index=df.index)).to_numpy(),
+			FILE_YEAR: (file_years if file_years is not None else pd.Series(pd.NA, index=df.index)).to_numpy(),
+			"gender": df.get("gender", pd.Series(pd.NA, index=df.index)).to_numpy(),
+		}))
+
+	def _carried_over(self) -> pd.DataFrame:
+		"""Previous rows from files outside a scoped build's --years/--tours; they are kept, not deleted."""
+		if not self.state_path.exists():
+			return pd.DataFrame(columns=STATE_COLUMNS)
+		state = pd.read_csv(self.state_path, dtype={"match_id": "string", "row_hash": "uint64", "event_year": "string", FILE_YEAR: "string", "gender": "string"})
+		if FILE_YEAR not in state.columns:
+			# state written before file years were recorded; event_year is the closest guess
+			state[FILE_YEAR] = state["event_year"]
+		if getattr(self.config, "sources", None) is not None:
+			# output rows do not record their source family (main vs qual), so keep them all
+			return state
+		outside = pd.Series(False, index=state.index)
+		years = scope_years(self.config)
+		if years is not None:
+			# the build reloads whole file partitions, whatever season their events fall in
+			year = state[FILE_YEAR].fillna(state["event_year"])
+			outside |= ~year.isin([str(y) for y in years])
+		tours = getattr(self.config, "tours", None)
+		if tours is not None:
+			outside |= ~state["gender"].map(_GENDER_TOURS).isin(tours)
+		return state[outside]
+
+	def finish(self) -> Tuple[int, int, int]:
+		"""Write deletions, the summary and the new state; returns (inserted, updated, deleted)."""
+		current = pd.concat(self.states, ignore_index=True) if self.states else pd.DataFrame(columns=STATE_COLUMNS)
+		carried = self._carried_over()
+		seen = pd.Index(current["match_id"]).append(pd.Index(carried["match_id"]))
+		gone = self.previous.index[~self.previous.index.isin(seen)]
+		self.deleted.write(pd.DataFrame({"match_id": gone}))
+		for writer in (self.inserted, self.updated):
+			if not writer.started:
+				# header-only file so consumers can always read all three deltas
+				writer.write(pd.DataFrame(columns=["match_id"]))
+		state = pd.concat([carried, current], ignore_index=True).drop_duplicates("match_id", keep="last")
+		state[STATE_COLUMNS].to_csv(self.out_dir / self.state_path.name, index=False)
+		counts = (self.inserted.rows, self.updated.rows, len(gone))
+		summary = pd.DataFrame({
+			"change": ["inserted", "updated", "deleted", "unchanged"],
+			"rows": [*counts, self.unchanged],
+		})
+		summary.to_csv(self.out_dir / f"{self.stem}_delta_summary.csv", index=False)
+		return counts
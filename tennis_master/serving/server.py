@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import logging
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from ..utils import COMPRESSION_SUFFIXES, SUCCESS_MARKER
+
+
+MATCHES_TABLE = "tennis_master_matches.csv"
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10_000
+
+_log = logging.getLogger(__name__)
+
+# identifiers stay text; low-cardinality labels become categories
+_STRING_COLUMNS = ("match_id", "tourney_id", "winner_id", "loser_id", "slam_match_id", "event_date", "event_year", "match_num")
+_CATEGORY_COLUMNS = ("source", "surface", "tourney_level", "round", "gender", "discipline", "winner_hand", "loser_hand", "winner_ioc", "loser_ioc", "winner_entry", "loser_entry", "has_points", "has_shots")
+
+
+def _find_table(out_dir: Path, name: str) -> Optional[Path]:
+	# the build may have written the table compressed (--compression)
+	for suffix in ("", *COMPRESSION_SUFFIXES.values()):
+		path = out_dir / (name + suffix)
+		if path.exists():
+			return path
+	return None
+
+
+def _read_marker(out_dir: Path) -> Optional[str]:
+	try:
+		return (out_dir / SUCCESS_MARKER).read_text().strip()
+	except FileNotFoundError:
+		return None
+
+
+def _positions(values: pd.Series) -> Dict[str, np.ndarray]:
+	# value -> sorted row positions, skipping missing keys
+	codes, uniques = pd.factorize(values.astype("string"), sort=False)
+	order = np.argsort(codes, kind="stable")
+	bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+	return {str(key): order[bounds[i]:bounds[i + 1]] for i, key in enumerate(uniques)}
+
+
+@dataclass
+class ServedTables:
+	"""One immutable snapshot of the built tables with row-position indexes."""
+	build: Optional[str]
+	matches: pd.DataFrame
+	players: pd.DataFrame
+	by_player: Dict[str, np.ndarray] = field(default_factory=dict)
+	by_tourney: Dict[str, np.ndarray] = field(default_factory=dict)
+	by_year: Dict[str, np.ndarray] = field(default_factory=dict)
+	loaded_at: float = field(default_factory=time.time)
+
+	@classmethod
+	def load(cls, out_dir: Path, matches_table: str = MATCHES_TABLE) -> "ServedTables":
+		build = _read_marker(out_dir)
+		path = _find_table(out_dir, matches_table)
+		if path is None:
+			raise FileNotFoundError(f"No {matches_table} in {out_dir}")
+		dtypes = {c: "string" for c in _STRING_COLUMNS}
+		dtypes.update({c: "category" for c in _CATEGORY_COLUMNS})
+		matches = pd.read_csv(path, dtype=dtypes, low_memory=False)
+		players_path = _find_table(out_dir, "dim_players.csv")
+		players = pd.read_csv(players_path, dtype="string") if players_path else pd.DataFrame()
+		# a player's matches are the union of their wins and losses
+		sides = pd.concat([matches["winner_id"], matches["loser_id"]], ignore_index=True)
+		by_side = _positions(sides)
+		n = len(matches)
+		by_player = {key: np.unique(pos % n) for key, pos in by_side.items()} if n else {}
+		return cls(
+			build=build,
+			matches=matches,
+			players=players,
+			by_player=by_player,
+			by_tourney=_positions(matches["tourney_id"]),
+			by_year=_positions(matches["event_year"]),
+		)
+
+	def query_matches(self, player: Optional[str] = None, opponent: Optional[str] = None, tourney: Optional[str] = None, year: Optional[str] = None) -> np.ndarray:
+		"""Row positions matching every given filter, in table order."""
+		selected: Optional[np.ndarray] = None
+		for index, key in ((self.by_player, player), (self.by_player, opponent), (self.by_tourney, tourney), (self.by_year, year)):
+			if key is None:
+				continue
+			rows = index.get(key, np.empty(0, dtype=np.intp))
+			selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+		if selected is None:
+			return np.arange(len(self.matches))
+		return selected
+
+	def records(self, positions: np.ndarray, limit: int, offset: int = 0) -> List[dict]:
+		page = self.matches.iloc[positions[offset:offset + limit]]
+		return json.loads(page.to_json(orient="records"))
+
+	def player(self, player_id: str) -> List[dict]:
+		if self.players.empty:
+			return []
+		hit = pd.Series(False, index=self.players.index)
+		for col in ("player_id_atp", "player_id_wta", "player_canonical_id"):
+			if col in self.players.columns:
+				hit |= self.players[col].eq(player_id).fillna(False)
+		return json.loads(self.players[hit].to_json(orient="records"))
+
+
+class TableStore:
+	"""Holds the current snapshot; a reload builds a new one and swaps the reference."""
+
+	def __init__(self, out_dir: Path, matches_table: str = MATCHES_TABLE):
+		self.out_dir = out_dir
+		self.matches_table = matches_table
+		self.tables = ServedTables.load(out_dir, matches_table)
+		self._lock = threading.Lock()
+
+	def reload_if_changed(self) -> bool:
+		"""Load a newly completed build; the old snapshot keeps serving until the swap."""
+		marker = _read_marker(self.out_dir)
+		if marker is None or marker == self.tables.build:
+			return False
+		with self._lock:
+			fresh = ServedTables.load(self.out_dir, self.matches_table)
+			# a build that started while we were reading leaves a different (or no) marker
+			if _read_marker(self.out_dir) != fresh.build:
+				return False
+			self.tables = fresh
+		return True
+
+	def watch(self, interval: float) -> threading.Thread:
+		def _poll() -> None:
+			while True:
+				time.sleep(interval)
+				try:
+					self.reload_if_changed()
+				except Exception as exc:  # keep serving the previous snapshot
+					_log.warning("reload of %s failed: %s", self.out_dir, exc)
+		thread = threading.Thread(target=_poll, name="table-reload", daemon=True)
+		thread.start()
+		return thread
+
+
+def _one(params: Dict[str, List[str]], name: str) -> Optional[str]:
+	values = params.get(name)
+	return values[0] if values else None
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+	"""GET /health, /matches?player=&opponent=&tourney=&year=&limit=&offset=, /players/<id>."""
+	store: TableStore
+
+	def _send(self, status: int, body: dict) -> None:
+		payload = json.dumps(body).encode("utf-8")
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(payload)))
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def do_GET(self) -> None:
+		# one snapshot per request, even if a reload swaps it meanwhile
+		tables = self.store.tables
+		url = urlparse(self.path)
+		params = parse_qs(url.query)
+		parts = [p for p in url.path.split("/") if p]
+		try:
+			if parts == ["health"]:
+				self._send(200, {"build": tables.build, "loaded_at": tables.loaded_at, "matches": len(tables.matches)})
+			elif parts == ["matches"]:
+				limit = min(int(_one(params, "limit") or DEFAULT_LIMIT), MAX_LIMIT)
+				offset = int(_one(params, "offset") or 0)
+				if limit < 0 or offset < 0:
+					raise ValueError("limit and offset must not be negative")
+				positions = tables.query_matches(
+					player=_one(params, "player"), opponent=_one(params, "opponent"),
+					tourney=_one(params, "tourney"), year=_one(params, "year"),
+				)
+				self._send(200, {"total": int(len(positions)), "offset": offset, "matches": tables.records(positions, limit, offset)})
+			elif len(parts) == 2 and parts[0] == "players":
+				self._send(200, {"players": tables.player(parts[1])})
+			else:
+				self._send(404, {"error": f"unknown path {url.path}"})
+		except ValueError as exc:
+			self._send(400, {"error": str(exc)})
+
+	def log_message(self, format: str, *args) -> None:
+		# per-request logging would dominate millisecond responses
+		pass
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	daemon_threads = True
+
+	def get_request(self):
+		# BaseHTTPRequestHandler expects a (host, port) client address
+		request, _ = super().get_request()
+		return request, ("local", 0)
+
+
+def serve(out_dir: Path, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[Path] = None, poll_interval: float = 2.0, matches_table: str = MATCHES_TABLE) -> None:
+	"""Load the built tables once and answer queries until interrupted, reloading after each build."""
+	store = TableStore(out_dir, matches_table)
+	handler = type("BoundQueryHandler", (QueryHandler,), {"store": store})
+	if socket_path is not None:
+		socket_path.unlink(missing_ok=True)
+		server = _ThreadingUnixHTTPServer(str(socket_path), handler)
+	else:
+		server = ThreadingHTTPServer((host, port), handler)
+	store.watch(poll_interval)
+	try:
+		server.serve_forever()
+	finally:
+		server.server_close()
+		if socket_path is not None:
+			socket_path.unlink(missing_ok=True)
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import csv
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
 
+from ..utils import file_in_scope, stable_id
+
 
 @dataclass
 class BuildConfig:
@@ -58,21 +65,135 @@ def _classify_dataset(path: Path) -> Tuple[str, str, str]:
 	return source, domain, kind
 
 
-def build_manifest(config: BuildConfig) -> pd.DataFrame:
-	rows = []
+_SAMPLE_BYTES = 64 * 1024
+_HASH_BLOCK = 1 << 20
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# carried over from the previous manifest when a file's size and mtime are unchanged
+_CONTENT_FIELDS = ["columns", "n_columns", "row_estimate", "schema_fingerprint", "content_sha1"]
+
+
+def _read_header(sample: bytes) -> List[str]:
+	line = sample.split(b"\n", 1)[0].decode("utf-8", errors="replace").lstrip("\ufeff").rstrip("\r")
+	return next(csv.reader([line]), [])
+
+
+def _estimate_rows(sample: bytes, size: int) -> int:
+	if size <= len(sample):
+		lines = sample.count(b"\n") + (0 if sample.endswith(b"\n") else 1)
+		return max(lines - 1, 0)
+	# average data-line length over the sample, ignoring the header and the cut-off last line
+	body = sample.split(b"\n", 1)[1] if b"\n" in sample else b""
+	lines = body.count(b"\n")
+	if not lines:
+		return 0
+	header_len = len(sample) - len(body)
+	return int(round((size - header_len) / (body.rfind(b"\n") + 1) * lines))
+
+
+def schema_fingerprint(columns: List[str]) -> str:
+	return stable_id(*[c.strip().lower() for c in columns])
+
+
+def _scan_file(root: Path, path: Path, previous: Dict[str, dict]) -> dict:
+	stat = path.stat()
+	source, domain, kind = _classify_dataset(path)
+	rel_path = str(path.relative_to(root))
+	row = {
+		"source": source,
+		"domain": domain,
+		"kind": kind,
+		"rel_path": rel_path,
+		"abs_path": str(path.resolve()),
+		"file_name": path.name,
+		"size_bytes": stat.st_size,
+		"mtime_ns": stat.st_mtime_ns,
+	}
+	prev = previous.get(rel_path)
+	if prev is not None and prev.get("size_bytes") == stat.st_size and prev.get("mtime_ns") == stat.st_mtime_ns:
+		row.update({k: prev[k] for k in _CONTENT_FIELDS})
+		return row
+	digest = hashlib.sha1()
+	with open(path, "rb") as fh:
+		sample = fh.read(_SAMPLE_BYTES)
+		digest.update(sample)
+		for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+			digest.update(block)
+	columns = _read_header(sample)
+	row.update({
+		"columns": "|".join(columns),
+		"n_columns": len(columns),
+		"row_estimate": _estimate_rows(sample, stat.st_size),
+		"schema_fingerprint": schema_fingerprint(columns),
+		"content_sha1": digest.hexdigest(),
+	})
+	return row
+
+
+def load_previous_manifest(out_dir: Path) -> Optional[pd.DataFrame]:
+	"""The manifest written by the last build into `out_dir`, if it has content fields."""
+	path = out_dir / "manifest.csv"
+	if not path.exists():
+		return None
+	prev = pd.read_csv(path, dtype={"columns": "string", "schema_fingerprint": "string", "content_sha1": "string"}, keep_default_na=False)
+	if not set(_CONTENT_FIELDS + ["mtime_ns"]).issubset(prev.columns):
+		return None
+	return prev
+
+
+def build_manifest(config: BuildConfig, previous: Optional[pd.DataFrame] = None) -> pd.DataFrame:
 	root = config.data_root
-	for csv in _iter_csvs(root):
-		source, domain, kind = _classify_dataset(csv)
-		rows.append({
-			"source": source,
-			"domain": domain,
-			"kind": kind,
-			"rel_path": str(csv.relative_to(root)),
-			"abs_path": str(csv.resolve()),
-			"file_name": csv.name,
-			"size_bytes": csv.stat().st_size,
-		})
+	known = {r["rel_path"]: r for r in previous.to_dict("records")} if previous is not None else {}
+	# scoped (--years/--tours/--sources) builds only inventory the files they read
+	paths = [p for p in _iter_csvs(root) if file_in_scope(config, p, _classify_dataset(p)[0])]
+	# I/O bound: hashing releases the GIL, so threads overlap reads across files
+	with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+		rows = list(pool.map(lambda p: _scan_file(root, p, known), paths))
 	manifest = pd.DataFrame(rows).sort_values(["source", "kind", "file_name"]).reset_index(drop=True)
 	return manifest
 
 
+def _family(file_name: str) -> str:
+	# atp_matches_1999.csv and atp_matches_2024.csv belong to the same file family
+	return re.sub(r"\d+", "#", file_name.lower())
+
+
+def detect_schema_drift(manifest: pd.DataFrame, previous: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+	"""Report files whose header differs from their family's usual header or from the previous scan.
+
+	Returns one row per drifting file with the columns added/removed relative to the reference header.
+	"""
+	cols = ["rel_path", "reason", "reference_fingerprint", "schema_fingerprint", "added_columns", "removed_columns"]
+	if manifest.empty:
+		return pd.DataFrame(columns=cols)
+	df = manifest.assign(family=manifest["source"].astype(str) + "/" + manifest["file_name"].map(_family))
+	# the most common header in a family is taken as its reference schema
+	ref = (
+		df.groupby(["family", "schema_fingerprint"], sort=False).size().rename("n").reset_index()
+		.sort_values(["family", "n"], ascending=[True, False], kind="stable").drop_duplicates("family")
+		.set_index("family")["schema_fingerprint"]
+	)
+	ref_columns = df.drop_duplicates("schema_fingerprint").set_index("schema_fingerprint")["columns"]
+	checks = [df.assign(reason="family", reference_fingerprint=df["family"].map(ref), reference_columns=lambda d: d["reference_fingerprint"].map(ref_columns))]
+	if previous is not None and not previous.empty and "schema_fingerprint" in previous.columns:
+		prev = previous.set_index("rel_path")
+		checks.append(df.assign(
+			reason="previous_scan",
+			reference_fingerprint=df["rel_path"].map(prev["schema_fingerprint"]),
+			reference_columns=df["rel_path"].map(prev["columns"]),
+		))
+	drift = pd.concat(checks, ignore_index=True)
+	drift = drift[drift["reference_fingerprint"].notna() & (drift["reference_fingerprint"] != drift["schema_fingerprint"])]
+	if drift.empty:
+		return pd.DataFrame(columns=cols)
+
+	def _diff(a: str, b: str) -> str:
+		base = set(str(b).split("|")) if pd.notna(b) else set()
+		return "|".join(c for c in str(a).split("|") if c not in base) if pd.notna(a) else ""
+
+	drift = drift.assign(
+		added_columns=[_diff(c, r) for c, r in zip(drift["columns"], drift["reference_columns"])],
+		removed_columns=[_diff(r, c) for c, r in zip(drift["columns"], drift["reference_columns"])],
+	)
+	return drift[cols].reset_index(drop=True)
+
+
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from ..integrations.sources import SOURCE_REGISTRY, TOUR_FAMILIES_WITH_FUTURES
+from ..utils import output_dir
+
+
+@dataclass
+class BuildConfig:
+	data_root: Path
+	out_dir: Path
+	strict_validation: bool = False
+
+
+class ValidationError(ValueError):
+	"""Raised in strict mode when loaded source rows break an error-level rule."""
+
+
+STAT_SIDES = ("w", "l")
+STAT_FIELDS = ("ace", "df", "svpt", "1stIn", "1stWon", "2ndWon", "SvGms", "bpSaved", "bpFaced")
+
+_TOUR_FAMILIES = [f for f in SOURCE_REGISTRY if f.name in TOUR_FAMILIES_WITH_FUTURES]
+
+# raw tourney_level codes each source is expected to use, from the source registry
+# (digits are ITF/futures prize money)
+KNOWN_LEVELS: Dict[str, Tuple[str, ...]] = {f.source: tuple(f.levels.codes) for f in _TOUR_FAMILIES}
+_NUMERIC_LEVEL_SOURCES = tuple(sorted({f.source for f in _TOUR_FAMILIES if f.levels.numeric_prefix}))
+
+REPORT_COLUMNS = [
+	"source", "rule", "severity", "columns", "row",
+	"tourney_id", "tourney_date", "match_num", "winner_id", "loser_id", "value",
+]
+
+
+class _Columns:
+	"""Column accessor for rule checks; numeric casts are computed once per column."""
+
+	def __init__(self, df: pd.DataFrame):
+		self.df = df
+		self._numeric: Dict[str, pd.Series] = {}
+
+	def text(self, name: str) -> pd.Series:
+		if name not in self.df.columns:
+			return pd.Series(pd.NA, index=self.df.index, dtype="string")
+		return self.df[name].astype("string").str.strip()
+
+	def num(self, name: str) -> pd.Series:
+		if name not in self._numeric:
+			self._numeric[name] = pd.to_numeric(self.text(name), errors="coerce")
+		return self._numeric[name]
+
+	def present(self, name: str) -> pd.Series:
+		return self.text(name).fillna("").ne("")
+
+
+@dataclass(frozen=True)
+class Rule:
+	"""A row-level check; `violated` returns True for every offending row."""
+	name: str
+	columns: Tuple[str, ...]
+	violated: Callable[[_Columns], pd.Series]
+	sources: Tuple[str, ...] = ()
+	severity: str = "error"
+
+
+def _bad_date(c: _Columns) -> pd.Series:
+	return ~c.text("tourney_date").fillna("").str.fullmatch(r"\d{8}")
+
+
+def _same_player(c: _Columns) -> pd.Series:
+	return c.present("winner_id") & c.text("winner_id").eq(c.text("loser_id")).fillna(False)
+
+
+def _missing_player(c: _Columns) -> pd.Series:
+	return ~(c.present("winner_id") & c.present("loser_id"))
+
+
+def _non_numeric_stats(c: _Columns) -> pd.Series:
+	bad = pd.Series(False, index=c.df.index)
+	for side in STAT_SIDES:
+		for stat in STAT_FIELDS:
+			col = f"{side}_{stat}"
+			if col in c.df.columns:
+				bad |= c.present(col) & c.num(col).isna()
+	return bad
+
+
+def _impossible_stats(c: _Columns) -> pd.Series:
+	bad = pd.Series(False, index=c.df.index)
+	for s in STAT_SIDES:
+		svpt, first_in = c.num(f"{s}_svpt"), c.num(f"{s}_1stIn")
+		pairs = [
+			(c.num(f"{s}_1stIn"), svpt),
+			(c.num(f"{s}_1stWon"), first_in),
+			(c.num(f"{s}_2ndWon"), svpt - first_in),
+			(c.num(f"{s}_ace"), svpt),
+			(c.num(f"{s}_df"), svpt),
+			(c.num(f"{s}_bpSaved"), c.num(f"{s}_bpFaced")),
+		]
+		for part, whole in pairs:
+			bad |= (part > whole).fillna(False)
+		for stat in STAT_FIELDS:
+			bad |= (c.num(f"{s}_{stat}") < 0).fillna(False)
+	return bad
+
+
+def _unknown_level(c: _Columns) -> pd.Series:
+	level = c.text("tourney_level").fillna("")
+	source = c.text("source").fillna("")
+	known = pd.Series(False, index=c.df.index)
+	for src, codes in KNOWN_LEVELS.items():
+		known |= source.eq(src) & level.isin(codes)
+	known |= source.isin(_NUMERIC_LEVEL_SOURCES) & level.str.fullmatch(r"\d+").fillna(False)
+	return ~known
+
+
+TOUR_SOURCES = tuple(dict.fromkeys(f.source for f in _TOUR_FAMILIES))
+
+MATCH_RULES: List[Rule] = [
+	Rule("tourney_date_not_yyyymmdd", ("tourney_date",), _bad_date, TOUR_SOURCES),
+	Rule("winner_is_loser", ("winner_id", "loser_id"), _same_player, TOUR_SOURCES),
+	Rule("missing_player_id", ("winner_id", "loser_id"), _missing_player, TOUR_SOURCES),
+	Rule("unknown_tourney_level", ("tourney_level",), _unknown_level, TOUR_SOURCES),
+	Rule("non_numeric_stat", tuple(f"{s}_{f}" for s in STAT_SIDES for f in STAT_FIELDS), _non_numeric_stats, TOUR_SOURCES),
+	# real scoring data carries a few of these, so they are reported but never abort
+	Rule("impossible_stat", tuple(f"{s}_{f}" for s in STAT_SIDES for f in STAT_FIELDS), _impossible_stats, TOUR_SOURCES, severity="warning"),
+]
+
+
+def _offending_values(hits: pd.DataFrame, columns: Tuple[str, ...]) -> pd.Series:
+	# wide rules (all serve stats) would just repeat the row; only short ones echo their inputs
+	present = [c for c in columns if c in hits.columns]
+	if not present or len(present) > 2:
+		return pd.Series("", index=hits.index, dtype="string")
+	value = hits[present[0]].astype("string").fillna("")
+	for col in present[1:]:
+		value = value + "|" + hits[col].astype("string").fillna("")
+	return value
+
+
+def validate_matches(df: pd.DataFrame, rules: List[Rule] = MATCH_RULES) -> pd.DataFrame:
+	"""Evaluate every rule column-wise over a loaded matches frame and return one row per violation."""
+	if df.empty:
+		return pd.DataFrame(columns=REPORT_COLUMNS)
+	cols = _Columns(df)
+	source = cols.text("source").fillna("")
+	found = []
+	for rule in rules:
+		applies = source.isin(rule.sources) if rule.sources else pd.Series(True, index=df.index)
+		if not applies.any():
+			continue
+		mask = rule.violated(cols).fillna(False).astype(bool) & applies
+		if not mask.any():
+			continue
+		hits = df.loc[mask]
+		found.append(pd.DataFrame({
+			"source": source[mask],
+			"rule": rule.name,
+			"severity": rule.severity,
+			"columns": "|".join(rule.columns),
+			"row": hits.index,
+			"tourney_id": cols.text("tourney_id")[mask],
+			"tourney_date": cols.text("tourney_date")[mask],
+			"match_num": cols.text("match_num")[mask],
+			"winner_id": cols.text("winner_id")[mask],
+			"loser_id": cols.text("loser_id")[mask],
+			"value": _offending_values(hits, rule.columns),
+		}))
+	if not found:
+		return pd.DataFrame(columns=REPORT_COLUMNS)
+	return pd.concat(found, ignore_index=True)[REPORT_COLUMNS]
+
+
+@dataclass
+class ValidationReport:
+	"""Collects violations of successive loads and writes them to `<out_dir>/<name>` (under scoped/ for scoped builds).
+
+	In strict mode the first load with error-level violations writes the report and raises.
+	With `sources`, only rows of those sources are checked (e.g. a separate futures report).
+	"""
+	config: BuildConfig
+	name: str = "validation_violations.csv"
+	sources: Tuple[str, ...] = ()
+	violations: List[pd.DataFrame] = field(default_factory=list)
+
+	def check(self, df: pd.DataFrame) -> None:
+		if self.sources and "source" in df.columns:
+			df = df[df["source"].isin(self.sources)]
+		found = validate_matches(df)
+		if not found.empty:
+			self.violations.append(found)
+		if getattr(self.config, "strict_validation", False) and found["severity"].eq("error").any():
+			path = self.write()
+			counts = found[found["severity"] == "error"].groupby(["source", "rule"]).size()
+			summary = ", ".join(f"{src}/{rule}: {n}" for (src, rule), n in counts.items())
+			raise ValidationError(f"Source rows failed validation ({summary}); see {path}")
+
+	def write(self) -> Path:
+		path = output_dir(self.config) / self.name
+		report = pd.concat(self.violations, ignore_index=True) if self.violations else pd.DataFrame(columns=REPORT_COLUMNS)
+		report.to_csv(path, index=False)
+		return path
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import gzip
 import hashlib
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
 import pandas as pd
 from unidecode import unidecode
@@ -15,6 +21,30 @@ def normalize_name(name: str) -> str:
 	return " ".join(unidecode(str(name)).strip().replace("_", " ").split()).title()
 
 
+# tourney names/slugs that refer to the same event across sources, as squashed lowercase tokens
+TOURNEY_KEY_ALIASES: Dict[str, str] = {
+	"ausopen": "australianopen",
+	"frenchopen": "rolandgarros",
+	"usopen": "usopen",
+	"wimbledon": "wimbledon",
+}
+
+
+def squashed_names(names: pd.Series, aliases: Optional[Dict[str, str]] = None) -> pd.Series:
+	"""Normalized lowercase alphanumeric key per row ("" when missing), folded through `aliases`."""
+	# normalize each distinct name once; names repeat across thousands of rows
+	mapping = {}
+	for name in names.dropna().unique():
+		squashed = "".join(ch for ch in normalize_name(name).lower() if ch.isalnum())
+		mapping[name] = aliases.get(squashed, squashed) if aliases else squashed
+	return names.map(mapping).astype("string").fillna("")
+
+
+def tourney_tokens(names: pd.Series) -> pd.Series:
+	"""Squashed tourney name key per row, with cross-source aliases folded together."""
+	return squashed_names(names, TOURNEY_KEY_ALIASES)
+
+
 def stable_id(*parts: Optional[str]) -> str:
 	joined = "|".join([(p or "").strip() for p in parts])
 	return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:16]
@@ -24,9 +54,267 @@ def read_csv_safely(path: Path, **kwargs) -> pd.DataFrame:
 	kwargs.setdefault("dtype", "string")
 	kwargs.setdefault("na_filter", True)
 	kwargs.setdefault("keep_default_na", True)
+	if kwargs.get("chunksize"):
+		return _read_chunks_safely(path, kwargs)
 	try:
 		return pd.read_csv(path, **kwargs)
 	except UnicodeDecodeError:
 		return pd.read_csv(path, encoding="latin1", **kwargs)
 
 
+def _read_chunks_safely(path: Path, kwargs: dict) -> Iterator[pd.DataFrame]:
+	# decoding errors surface while iterating; restart in latin1 and skip the chunks already yielded
+	done = 0
+	try:
+		for chunk in pd.read_csv(path, **kwargs):
+			done += 1
+			yield chunk
+	except UnicodeDecodeError:
+		for i, chunk in enumerate(pd.read_csv(path, encoding="latin1", **kwargs)):
+			if i >= done:
+				yield chunk
+
+
+
+
+TOURS = ("atp", "wta")
+# file families a build can be scoped to with --sources
+SOURCE_FAMILIES = ("main", "qual", "futures", "slam", "mcp")
+
+
+def parse_years(spec: Optional[str], allowed: Optional[range] = None) -> Optional[Tuple[int, ...]]:
+	"""Parse "2020-2024", "2019,2021" or a mix of both into sorted years; None/empty means all.
+
+	Years outside `allowed` (e.g. MATCH_YEARS) are rejected, since no source file covers them.
+	"""
+	if not spec:
+		return None
+	years = set()
+	for part in spec.split(","):
+		part = part.strip()
+		if not part:
+			continue
+		lo, _, hi = part.partition("-")
+		if not lo.strip().isdigit() or (hi and not hi.strip().isdigit()):
+			raise ValueError(f"Invalid year range: {part!r}")
+		start, end = int(lo), int(hi) if hi else int(lo)
+		if end < start:
+			raise ValueError(f"Invalid year range: {part!r}")
+		years.update(range(start, end + 1))
+	unknown = sorted(y for y in years if allowed is not None and y not in allowed)
+	if unknown:
+		raise ValueError(f"No match files for year(s) {', '.join(map(str, unknown))}; expected {allowed.start}-{allowed.stop - 1}")
+	return tuple(sorted(years))
+
+
+def parse_names(spec: Optional[str], allowed: Tuple[str, ...]) -> Optional[FrozenSet[str]]:
+	"""Parse a comma-separated subset of `allowed`; None/empty means all."""
+	if not spec:
+		return None
+	names = frozenset(n.strip().lower() for n in spec.split(",") if n.strip())
+	unknown = names - set(allowed)
+	if unknown:
+		raise ValueError(f"Unknown value(s) {', '.join(sorted(unknown))}; expected any of {', '.join(allowed)}")
+	return names
+
+
+def scope_years(config, years: Optional[Iterable[int]] = None) -> Optional[List[int]]:
+	"""Intersect `years` with the build's --years scope; None means unrestricted."""
+	wanted = getattr(config, "years", None)
+	if years is None:
+		return None if wanted is None else list(wanted)
+	return [y for y in years if wanted is None or y in wanted]
+
+
+def in_scope(config, tour: Optional[str] = None, source: Optional[str] = None) -> bool:
+	"""Whether the build's --tours/--sources scope includes `tour` and `source`."""
+	tours = getattr(config, "tours", None)
+	sources = getattr(config, "sources", None)
+	return (tour is None or tours is None or tour in tours) and (source is None or sources is None or source in sources)
+
+
+SCOPED_DIR = "scoped"
+
+
+# year of the match file partition a row was loaded from; scoped builds rebuild whole partitions,
+# and a partition can hold events dated into the previous season (e.g. Brisbane on Dec 31)
+FILE_YEAR = "file_year"
+
+
+def is_scoped(config) -> bool:
+	"""Whether the build is restricted by --years, --tours or --sources."""
+	return any(getattr(config, name, None) is not None for name in ("years", "tours", "sources"))
+
+
+def output_dir(config) -> Path:
+	"""Directory a build writes to: out_dir, or `<out_dir>/scoped` for a scoped build.
+
+	A scoped build only holds a slice of the data, so it never replaces the full tables or their
+	_SUCCESS marker; incremental state (deltas, season tables) is still read from out_dir.
+	"""
+	return config.out_dir / SCOPED_DIR if is_scoped(config) else config.out_dir
+
+
+def file_years(name: str) -> Optional[range]:
+	# atp_matches_2020.csv, 2020-wimbledon-matches.csv, atp_rankings_10s.csv, charting-m-points-2010s.csv, ...-to-2009.csv
+	m = re.search(r"_(\d{4})\.csv$", name) or re.match(r"(\d{4})-", name)
+	if m:
+		return range(int(m.group(1)), int(m.group(1)) + 1)
+	m = re.search(r"(\d{4})s\.csv$", name)
+	if m:
+		return range(int(m.group(1)), int(m.group(1)) + 10)
+	m = re.search(r"_(\d{2})s\.csv$", name)
+	if m:
+		start = int(m.group(1)) + (1900 if int(m.group(1)) >= 60 else 2000)
+		return range(start, start + 10)
+	m = re.search(r"to-(\d{4})\.csv$", name)
+	if m:
+		return range(1900, int(m.group(1)) + 1)
+	if "current" in name:
+		return range(2020, 2100)
+	return None
+
+
+def _file_tour(name: str) -> Optional[str]:
+	if name.startswith(("atp_", "charting-m-")):
+		return "atp"
+	if name.startswith(("wta_", "charting-w-")):
+		return "wta"
+	return None
+
+
+def _file_family(name: str, source: str) -> Optional[str]:
+	if source == "slam_pbp":
+		return "slam"
+	if source == "mcp":
+		return "mcp"
+	if "_matches_" not in name:
+		return None
+	if "qual_" in name:
+		return "qual"
+	if "futures" in name:
+		return "futures"
+	return "main"
+
+
+def file_in_scope(config, path: Path, source: str, lookback_years: int = 0) -> bool:
+	"""Whether a source file can hold rows inside the build's --years/--tours/--sources scope.
+
+	Years, tour and family are read from the file name only, so out-of-scope files are never
+	opened; `lookback_years` widens the year window (e.g. rankings in force at the first date).
+	"""
+	name = path.name.lower()
+	tour = _file_tour(name)
+	if not in_scope(config, tour=tour, source=_file_family(name, source)):
+		return False
+	wanted = getattr(config, "years", None)
+	covered = file_years(name)
+	if wanted is None or covered is None:
+		return True
+	return any(y in covered for w in wanted for y in range(w - lookback_years, w + 1))
+
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+_CHUNK_ROWS = 100_000
+_WRITE_THREADS = os.cpu_count() or 1
+
+
+def output_path(path: Path, compression: Optional[str] = None) -> Path:
+	"""Actual file written for `path` under `compression` (e.g. matches.csv -> matches.csv.gz)."""
+	if not compression or compression == "none":
+		return path
+	return path.with_name(path.name + COMPRESSION_SUFFIXES[compression])
+
+
+def _compressor(compression: Optional[str]) -> Callable[[bytes], bytes]:
+	if not compression or compression == "none":
+		return lambda data: data
+	if compression == "gzip":
+		# each chunk is a complete gzip member; concatenated members are a valid .gz stream
+		return lambda data: gzip.compress(data, compresslevel=6)
+	if compression == "zstd":
+		try:
+			import zstandard
+		except ImportError as exc:
+			raise ValueError("zstd compression requires the 'zstandard' package (pip install zstandard)") from exc
+		# likewise, concatenated zstd frames decode as one stream
+		return lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+	raise ValueError(f"Unknown compression: {compression}")
+
+
+def check_compression(compression: Optional[str]) -> None:
+	"""Raise ValueError early when `compression` is unknown or its codec is not installed."""
+	_compressor(compression)
+
+
+class PartitionedCsvWriter:
+	"""Write one CSV from successive DataFrame partitions; the header comes from the first one.
+
+	Rows are serialized in fixed-size chunks on the calling thread (to_csv holds the GIL); only
+	the compression of each chunk runs on a thread pool, since zlib/zstd release the GIL. Chunks
+	are streamed to disk in order, so gzip/zstd output stays readable by standard tools. The
+	first write removes the table's files under the other compressions, so readers never pick
+	up a stale variant.
+	"""
+
+	def __init__(self, path: Path, compression: Optional[str] = None):
+		self.path = output_path(path, compression)
+		self.rows = 0
+		self._base = path
+		self._compressed = bool(compression) and compression != "none"
+		self._compress = _compressor(compression)
+		self._started = False
+
+	@property
+	def started(self) -> bool:
+		"""Whether any partition (even an empty one) has been written, i.e. the file exists with its header."""
+		return self._started
+
+	def _chunks(self, df: pd.DataFrame) -> Iterator[bytes]:
+		for i, start in enumerate(range(0, max(len(df), 1), _CHUNK_ROWS)):
+			header = not self._started and i == 0
+			yield df.iloc[start:start + _CHUNK_ROWS].to_csv(index=False, header=header).encode("utf-8")
+
+	def write(self, df: pd.DataFrame) -> None:
+		if not self._started:
+			for variant in (self._base, *(self._base.with_name(self._base.name + s) for s in COMPRESSION_SUFFIXES.values())):
+				if variant != self.path:
+					variant.unlink(missing_ok=True)
+		with open(self.path, "ab" if self._started else "wb") as fh:
+			if not self._compressed:
+				for data in self._chunks(df):
+					fh.write(data)
+			else:
+				with ThreadPoolExecutor(max_workers=_WRITE_THREADS) as pool:
+					pending = deque()
+					for data in self._chunks(df):
+						pending.append(pool.submit(self._compress, data))
+						# bound the chunks held in memory to a couple per thread
+						if len(pending) >= 2 * _WRITE_THREADS:
+							fh.write(pending.popleft().result())
+					while pending:
+						fh.write(pending.popleft().result())
+		self.rows += len(df)
+		self._started = True
+
+
+def write_csv(df: pd.DataFrame, path: Path, compression: Optional[str] = None) -> Path:
+	"""Write `df` with the chunked (optionally compressed) writer; returns the file written."""
+	writer = PartitionedCsvWriter(path, compression)
+	writer.write(df)
+	return writer.path
+
+
+SUCCESS_MARKER = "_SUCCESS"
+
+
+def clear_success_marker(out_dir: Path) -> None:
+	"""Remove the completion marker while a build rewrites `out_dir`."""
+	(out_dir / SUCCESS_MARKER).unlink(missing_ok=True)
+
+
+def write_success_marker(out_dir: Path) -> None:
+	"""Atomically mark `out_dir` as fully written; the content identifies the build."""
+	tmp = out_dir / f".{SUCCESS_MARKER}.tmp"
+	tmp.write_text(f"{time.time_ns()}\n")
+	os.replace(tmp, out_dir / SUCCESS_MARKER)
@@ -4,6 +4,10 @@ from pathlib import Path
 
 import click
 
+from tennis_master.integrations.sources import FUTURES_YEARS, MATCH_YEARS
+from tennis_master.staging.validation import ValidationError
+from tennis_master.utils import SOURCE_FAMILIES, TOURS, check_compression, parse_names, parse_years
+
 from .pipeline.build import build_all_with_futures, build_futures_only
 
 
@@ -16,21 +20,51 @@ def cli():
 @cli.command()
 @click.option("--data-root", type=click.Path(exists=True, file_okay=False, path_type=Path), required=True)
 @click.option("--out-dir", type=click.Path(file_okay=False, path_type=Path), required=True)
-def build(data_root: Path, out_dir: Path):
+@click.option("--strict", is_flag=True, default=False, help="Abort right after loading if source rows break a validation rule.")
+@click.option("--low-memory", is_flag=True, default=False, help="Process and append one year at a time; same output, peak memory of a single year.")
+@click.option("--compression", type=click.Choice(["none", "gzip", "zstd"]), default="none", show_default=True, help="Compress the large outputs (matches, points, shots) with multiple threads.")
+@click.option("--years", default=None, help="Only build these years, e.g. 2020-2024 or 2019,2021. Out-of-scope files are never read.")
+@click.option("--tours", default=None, help="Only build these tours: comma-separated atp,wta.")
+@click.option("--sources", default=None, help="Only build these source families: comma-separated main,qual,futures,slam,mcp.")
+def build(data_root: Path, out_dir: Path, strict: bool, low_memory: bool, compression: str, years: str, tours: str, sources: str):
 	"""Build all outputs including ATP futures matches."""
+	try:
+		check_compression(compression)
+	except ValueError as exc:
+		raise click.BadParameter(str(exc), param_hint="--compression")
+	try:
+		scope = dict(years=parse_years(years, MATCH_YEARS), tours=parse_names(tours, TOURS), sources=parse_names(sources, SOURCE_FAMILIES))
+	except ValueError as exc:
+		raise click.BadParameter(str(exc))
 	out_dir.mkdir(parents=True, exist_ok=True)
-	build_all_with_futures(data_root=data_root, out_dir=out_dir)
-	click.echo(f"Build complete with futures. Outputs in {out_dir}")
+	try:
+		written = build_all_with_futures(data_root=data_root, out_dir=out_dir, strict_validation=strict, low_memory=low_memory, compression=compression, **scope)
+	except ValidationError as exc:
+		raise click.ClickException(str(exc))
+	click.echo(f"Build complete with futures. Outputs in {written}")
 
 
 @cli.command()
 @click.option("--data-root", type=click.Path(exists=True, file_okay=False, path_type=Path), required=True)
 @click.option("--out-dir", type=click.Path(file_okay=False, path_type=Path), required=True)
-def futures_only(data_root: Path, out_dir: Path):
+@click.option("--strict", is_flag=True, default=False, help="Abort right after loading if source rows break a validation rule.")
+@click.option("--compression", type=click.Choice(["none", "gzip", "zstd"]), default="none", show_default=True, help="Compress the large outputs (matches, points, shots) with multiple threads.")
+@click.option("--years", default=None, help="Only build these years, e.g. 2020-2024 or 2019,2021.")
+def futures_only(data_root: Path, out_dir: Path, strict: bool, compression: str, years: str):
 	"""Build only futures matches for testing."""
-	out_dir.mkdir(parents=True, exist_ok=True)
-	build_futures_only(data_root=data_root, out_dir=out_dir)
-	click.echo(f"Futures-only build complete. Outputs in {out_dir}")
+	try:
+		check_compression(compression)
+	except ValueError as exc:
+		raise click.BadParameter(str(exc), param_hint="--compression")
+	try:
+		year_scope = parse_years(years, FUTURES_YEARS)
+	except ValueError as exc:
+		raise click.BadParameter(str(exc), param_hint="--years")
+	try:
+		written = build_futures_only(data_root=data_root, out_dir=out_dir, strict_validation=strict, compression=compression, years=year_scope)
+	except ValidationError as exc:
+		raise click.ClickException(str(exc))
+	click.echo(f"Futures-only build complete. Outputs in {written}")
 
 
 if __name__ == "__main__":
@@ -3,81 +3,122 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Optional, Tuple
 
 # Import from main tennis_master package
-import sys
-sys.path.append('/Users/ajitbehera/Codes/Tennis-Master-Project')
-from tennis_master.staging.manifest import build_manifest
+from tennis_master.staging.manifest import build_manifest, detect_schema_drift, load_previous_manifest
+from tennis_master.staging.validation import ValidationReport
 from tennis_master.dimensions.players import build_players
 from tennis_master.dimensions.tournaments import build_tournaments
-from tennis_master.integrations.matches import integrate_atp_wta, enrich_match_fields, normalize_tourney_level
-from tennis_master.integrations.slam_mcp_flags import flag_slam_points, flag_mcp_shots, union_slam_matches, build_points_outputs
+from tennis_master.integrations.sources import MATCH_YEARS, TOUR_FAMILIES_WITH_FUTURES
+from tennis_master.integrations.slam_mcp_flags import build_points_outputs
+from tennis_master.integrations.points import slam_pairs
+from tennis_master.integrations.rankings import RankingTable, RankingWindow, load_rankings
+from tennis_master.pipeline.build import load_match_partition, finish_matches
+from tennis_master.pipeline.aggregates import AggregateTracker
+from tennis_master.pipeline.deltas import DeltaTracker
+from tennis_master.utils import FILE_YEAR, PartitionedCsvWriter, clear_success_marker, output_dir, scope_years, write_success_marker, write_csv
 
 # Import futures-specific modules
-from ..integrations.matches import integrate_atp_futures, enrich_futures_match_fields, normalize_futures_tourney_level
+from ..integrations.matches import FUTURES_SOURCE, integrate_atp_futures, enrich_futures_match_fields, normalize_futures_tourney_level
 
 
 @dataclass
 class BuildConfig:
 	data_root: Path
 	out_dir: Path
+	strict_validation: bool = False
+	low_memory: bool = False
+	compression: Optional[str] = None
+	years: Optional[Tuple[int, ...]] = None
+	tours: Optional[frozenset] = None
+	sources: Optional[frozenset] = None
 
 
-def build_all_with_futures(data_root: Path, out_dir: Path) -> None:
+def build_all_with_futures(data_root: Path, out_dir: Path, strict_validation: bool = False, low_memory: bool = False, compression: Optional[str] = None, years: Optional[Tuple[int, ...]] = None, tours: Optional[frozenset] = None, sources: Optional[frozenset] = None) -> Path:
 	"""Build all outputs including ATP futures matches."""
-	config = BuildConfig(data_root=data_root, out_dir=out_dir)
+	config = BuildConfig(data_root=data_root, out_dir=out_dir, strict_validation=strict_validation, low_memory=low_memory, compression=compression, years=years, tours=tours, sources=sources)
+	# a scoped build writes its slice to <out_dir>/scoped and leaves the full outputs alone
+	out_dir = output_dir(config)
 	out_dir.mkdir(parents=True, exist_ok=True)
+	# readers (e.g. `serve`) only trust out_dir once the marker is back
+	clear_success_marker(out_dir)
 	
 	# 1) Inventory datasets
-	manifest_df = build_manifest(config)
+	previous_manifest = load_previous_manifest(out_dir)
+	manifest_df = build_manifest(config, previous=previous_manifest)
 	manifest_path = out_dir / "manifest.csv"
 	manifest_df.to_csv(manifest_path, index=False)
+	detect_schema_drift(manifest_df, previous_manifest).to_csv(out_dir / "schema_drift.csv", index=False)
 	
 	# 2) Dimensions
 	players_dim, player_aliases = build_players(config)
 	players_dim.to_csv(out_dir / "dim_players.csv", index=False)
 	player_aliases.to_csv(out_dir / "player_aliases.csv", index=False)
 
-	tourneys_dim, tourney_aliases = build_tournaments(config)
+	# futures tournaments join the dimension so futures names resolve too
+	tourneys_dim, tourney_aliases, tourneys = build_tournaments(config, TOUR_FAMILIES_WITH_FUTURES)
 	tourneys_dim.to_csv(out_dir / "dim_tournaments.csv", index=False)
 	tourney_aliases.to_csv(out_dir / "tournament_aliases.csv", index=False)
 
-	# 3) Integrate ATP+WTA matches (existing logic)
-	matches = integrate_atp_wta(config)
-	matches = flag_slam_points(config, matches)
-	matches = flag_mcp_shots(config, matches)
-	
-	# union Slam singles matches as base rows
-	slam_rows = union_slam_matches(config)
-	if not slam_rows.empty:
-		matches = pd.concat([matches, slam_rows], ignore_index=True)
-	
-	# 4) Integrate ATP Futures matches
-	futures_matches = integrate_atp_futures(config)
-	futures_matches = enrich_futures_match_fields(futures_matches)
-	futures_matches = normalize_futures_tourney_level(futures_matches)
-	
-	# 5) Combine all matches
-	all_matches = pd.concat([matches, futures_matches], ignore_index=True)
-	all_matches = enrich_match_fields(all_matches)
-	all_matches = normalize_tourney_level(all_matches)
-	
-	# 6) Save the combined matches with futures
-	all_matches.to_csv(out_dir / "tennis_master_matches_futures_included.csv", index=False)
-	
-	# 7) Also save the original matches without futures for comparison
-	matches = enrich_match_fields(matches)
-	matches = normalize_tourney_level(matches)
-	matches.to_csv(out_dir / "tennis_master_matches.csv", index=False)
+	# 3) Integrate ATP+WTA+Slam and ATP Futures matches per year partition
+	# each year partition loads every registry family together (futures included), so no file is
+	# read twice for the two outputs; futures violations get their own report
+	report = ValidationReport(config, sources=("atp", "wta"))
+	futures_report = ValidationReport(config, name="validation_violations_futures.csv", sources=(FUTURES_SOURCE,))
+	reports = [report, futures_report]
+	with_futures = PartitionedCsvWriter(out_dir / "tennis_master_matches_futures_included.csv", config.compression)
+	# the original matches without futures, for comparison
+	without_futures = PartitionedCsvWriter(out_dir / "tennis_master_matches.csv", config.compression)
+	with_futures_deltas = DeltaTracker(config, "tennis_master_matches_futures_included")
+	without_futures_deltas = DeltaTracker(config)
+	with_futures_aggregates = AggregateTracker(config, players_dim, "_futures_included")
+	without_futures_aggregates = AggregateTracker(config, players_dim)
+
+	pairs = []
+
+	def _write(raw: pd.DataFrame, rankings: Dict[str, RankingTable]) -> None:
+		combined = finish_matches(raw, players_dim, rankings)
+		file_years = combined.pop(FILE_YEAR)
+		main = combined["source"].ne(FUTURES_SOURCE).fillna(True)
+		matches = combined[main]
+		without_futures.write(matches)
+		without_futures_deltas.add(matches, file_years[main])
+		without_futures_aggregates.add(matches, file_years[main])
+		with_futures.write(combined)
+		with_futures_deltas.add(combined, file_years)
+		with_futures_aggregates.add(combined, file_years)
+		slam = slam_pairs(combined)
+		# most years hold no Slam rows; concatenating their empty frames is deprecated in pandas
+		if not slam.empty:
+			pairs.append(slam)
+
+	if config.low_memory:
+		# peak memory is bounded by the largest single year and the ranking files around it
+		window = RankingWindow(config)
+		for year in scope_years(config, MATCH_YEARS):
+			_write(load_match_partition(config, year, reports, TOUR_FAMILIES_WITH_FUTURES, tourneys), window.tables([year]))
+	else:
+		# the same per-year loads, held together and finished in one call
+		_write(pd.concat([load_match_partition(config, year, reports, TOUR_FAMILIES_WITH_FUTURES, tourneys) for year in scope_years(config, MATCH_YEARS)], ignore_index=True), load_rankings(config))
+	report.write()
+	futures_report.write()
+	with_futures_deltas.finish()
+	without_futures_deltas.finish()
+	with_futures_aggregates.finish()
+	without_futures_aggregates.finish()
 
-	# 8) build points and shots outputs
-	build_points_outputs(config, out_dir)
+	# 4) build points and shots outputs
+	build_points_outputs(config, out_dir, pd.concat(pairs, ignore_index=True) if pairs else None)
+	write_success_marker(out_dir)
+	return out_dir
 
 
-def build_futures_only(data_root: Path, out_dir: Path) -> None:
-	"""Build only futures matches for testing."""
-	config = BuildConfig(data_root=data_root, out_dir=out_dir)
+def build_futures_only(data_root: Path, out_dir: Path, strict_validation: bool = False, compression: Optional[str] = None, years: Optional[Tuple[int, ...]] = None) -> Path:
+	"""Build only futures matches for testing; returns the directory written (scoped/ with --years)."""
+	config = BuildConfig(data_root=data_root, out_dir=out_dir, strict_validation=strict_validation, compression=compression, years=years)
+	# the matches file and the validation report both go where a scoped build writes
+	out_dir = output_dir(config)
 	out_dir.mkdir(parents=True, exist_ok=True)
 	
 	# Integrate only ATP Futures matches
@@ -86,8 +127,9 @@ def build_futures_only(data_root: Path, out_dir: Path) -> None:
 	futures_matches = normalize_futures_tourney_level(futures_matches)
 	
 	# Save futures matches
-	futures_matches.to_csv(out_dir / "tennis_master_matches_futures_only.csv", index=False)
+	write_csv(futures_matches, out_dir / "tennis_master_matches_futures_only.csv", config.compression)
 	
 	print(f"Futures matches saved: {len(futures_matches)} matches")
 	print(f"Years covered: {futures_matches['event_year'].unique() if 'event_year' in futures_matches.columns else 'N/A'}")
 	print(f"Tournament levels: {futures_matches['tourney_level'].unique() if 'tourney_level' in futures_matches.columns else 'N/A'}")
+	return out_dir
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pandas as pd
+
+from tennis_master.pipeline.aggregates import AggregateTracker, h2h_partials, season_partials
+
+
+def _matches(*rows):
+	columns = ["gender", "event_year", "event_date", "surface", "tourney_level", "winner_id", "loser_id", "is_walkover", "w_ace", "l_ace", "minutes"]
+	return pd.DataFrame(list(rows), columns=columns, dtype="string")
+
+
+def test_h2h_orders_the_pair_and_tracks_the_last_meeting():
+	out = h2h_partials(_matches(
+		("M", "2019", "2019-01-20", "Hard", "G", "200", "100", "False", "5", "2", "120"),
+		("M", "2019", "2019-06-01", "Hard", "G", "100", "200", "False", "3", "4", "90"),
+		("M", "2019", "2019-03-01", "Hard", "G", "200", "100", "False", "1", "1", "60"),
+		("M", "2019", "2019-04-01", "Hard", "G", "200", "100", "True", None, None, None),
+	))
+	assert len(out) == 1
+	row = out.iloc[0]
+	assert (row["player_a"], row["player_b"]) == ("100", "200")
+	assert (row["matches"], row["a_wins"], row["b_wins"]) == (3, 1, 2)
+	assert (row["first_meeting"], row["last_meeting"], row["last_winner_id"]) == ("2019-01-20", "2019-06-01", "100")
+
+
+def test_season_sums_both_sides_and_keeps_unrecorded_stats_empty():
+	out = season_partials(_matches(
+		("M", "2019", "2019-01-20", "Hard", "G", "100", "200", "False", "5", None, "120"),
+		("M", "2019", "2019-02-20", "Hard", "G", "300", "100", "False", "3", "4", "90"),
+	)).set_index("player_id")
+	assert (out.loc["100", "matches"], out.loc["100", "wins"], out.loc["100", "losses"]) == (2, 1, 1)
+	assert out.loc["100", "aces"] == 9
+	assert out.loc["100", "minutes"] == 210
+	assert pd.isna(out.loc["200", "aces"])
+
+
+def _tracker(tmp_path, players, **scope):
+	config = SimpleNamespace(out_dir=tmp_path, years=scope.get("years"), tours=scope.get("tours"), sources=scope.get("sources"))
+	return AggregateTracker(config, players)
+
+
+def test_tracker_keys_players_by_canonical_id(tmp_path):
+	players = pd.DataFrame({"player_canonical_id": ["c1", "c2"], "player_id_atp": ["100", "200"], "player_id_wta": [pd.NA, pd.NA]})
+	tracker = _tracker(tmp_path, players)
+	tracker.add(_matches(
+		("M", "2019", "2019-01-20", "Hard", "G", "100", "200", "False", "5", "2", "120"),
+		("M", "2020", "2020-01-20", "Clay", "A", "200", "100", "False", "5", "2", "120"),
+		("M", "2020", "2020-02-20", "Clay", "A", "200", "999", "False", "5", "2", "120"),
+	))
+	tracker.finish()
+	h2h = pd.read_csv(tmp_path / "h2h.csv", dtype="string")
+	assert sorted(zip(h2h["player_a"], h2h["player_b"])) == [("999", "c2"), ("c1", "c2"), ("c1", "c2")]
+	seasons = pd.read_csv(tmp_path / "player_season.csv", dtype="string")
+	assert set(seasons["player_id"]) == {"c1", "c2", "999"}
+
+
+def test_scoped_tracker_rebuilds_only_its_seasons(tmp_path):
+	players = pd.DataFrame(columns=["player_canonical_id", "player_id_atp", "player_id_wta"])
+	full = _tracker(tmp_path, players)
+	full.add(_matches(
+		("M", "2019", "2019-01-20", "Hard", "G", "100", "200", "False", "5", "2", "120"),
+		("M", "2020", "2020-01-20", "Hard", "G", "100", "200", "False", "5", "2", "120"),
+		# Brisbane: a 2019 season row that lives in the 2020 match file
+		("M", "2019", "2019-12-31", "Hard", "A", "300", "100", "False", "5", "2", "120"),
+	), pd.Series([2019, 2020, 2020]))
+	full.finish()
+	(tmp_path / "scoped").mkdir()
+	scoped = _tracker(tmp_path, players, years=(2020,))
+	scoped.add(_matches(
+		("M", "2020", "2020-01-20", "Hard", "G", "200", "100", "False", "5", "2", "120"),
+		("M", "2019", "2019-12-31", "Hard", "A", "300", "100", "False", "5", "2", "120"),
+	), pd.Series([2020, 2020]))
+	scoped.finish()
+	h2h = pd.read_csv(tmp_path / "scoped" / "h2h.csv", dtype="string").set_index(["player_a", "player_b"])
+	row = h2h.loc[("100", "200")]
+	assert (row["matches"], row["a_wins"], row["b_wins"], row["last_winner_id"]) == ("2", "1", "1", "200")
+	assert h2h.loc[("100", "300"), "matches"] == "1"
+	assert pd.read_csv(tmp_path / "h2h.csv", dtype="string").set_index(["player_a", "player_b"]).loc[("100", "200"), "a_wins"] == "2"
+	# rebuilding only the 2019 file leaves every table as the full build wrote it
+	scoped = _tracker(tmp_path, players, years=(2019,))
+	scoped.add(_matches(("M", "2019", "2019-01-20", "Hard", "G", "100", "200", "False", "5", "2", "120")), pd.Series([2019]))
+	scoped.finish()
+	for name in ["h2h.csv", "h2h_by_year.csv", "player_season.csv"]:
+		assert (tmp_path / "scoped" / name).read_text() == (tmp_path / name).read_text()
+
+
+def test_sources_build_skips_the_tables(tmp_path, caplog):
+	tracker = _tracker(tmp_path, pd.DataFrame(), sources=frozenset({"main"}))
+	tracker.add(_matches(("M", "2019", "2019-01-20", "Hard", "G", "100", "200", "False", "5", "2", "120")))
+	tracker.finish()
+	assert not (tmp_path / "h2h.csv").exists()
+	assert "not rebuilt" in caplog.text
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from tennis_master.integrations.dedup import dedup_matches, match_keys
+
+
+def _matches(*rows):
+	columns = ["source", "gender", "tourney_id", "tourney_name", "tourney_date", "round", "winner_name", "loser_name", "score", "has_points"]
+	return pd.DataFrame([dict(zip(columns, r)) for r in rows], columns=columns, dtype="string")
+
+
+def test_match_keys_ignore_player_order_and_name_accents():
+	df = _matches(
+		("atp", "M", "2019-580", "Australian Open", "20190114", "R128", "Rafael Nadal", "James Duckworth", None, None),
+		("slam_pbp", "M", "ausopen", "ausopen", "2019", "1", "James Duckworth", "Rafael Nádal", None, None),
+		("atp", "M", "2019-580", "Australian Open", "20190114", "R128", "Rafael Nadal", None, None, None),
+	)
+	keys = match_keys(df)
+	assert keys[0] == keys[1]
+	assert pd.isna(keys[2])
+
+
+def test_weekly_futures_with_the_same_name_stay_apart():
+	df = _matches(
+		("atp_futures", "M", "2019-M-ITF-TUN-01A-2019", "M15 Monastir", "20190107", "R32", "A Player", "B Player", "6-1 6-1", None),
+		("atp_futures", "M", "2019-M-ITF-TUN-05A-2019", "M15 Monastir", "20190204", "R32", "A Player", "B Player", "6-2 6-2", None),
+	)
+	out = dedup_matches(df)
+	assert len(out) == 2
+	assert out["score"].tolist() == ["6-1 6-1", "6-2 6-2"]
+
+
+def test_same_source_rows_are_never_merged():
+	df = _matches(
+		("atp_futures", "M", None, "M15 Monastir", "20190107", "R32", "A Player", "B Player", "6-1 6-1", None),
+		("atp_futures", "M", None, "M15 Monastir", "20190107", "R32", "A Player", "B Player", "6-2 6-2", None),
+	)
+	assert len(dedup_matches(df)) == 2
+
+
+def test_different_tour_ids_are_different_matches():
+	df = _matches(
+		("atp", "M", "2019-1000", "Monastir", "20190107", "R32", "A Player", "B Player", "6-1 6-1", None),
+		("atp_futures", "M", "2019-M-ITF-TUN-01A-2019", "Monastir", "20190107", "R32", "A Player", "B Player", None, None),
+	)
+	assert len(dedup_matches(df)) == 2
+
+
+def test_slam_row_fills_tour_row_within_the_date_window():
+	df = _matches(
+		("atp", "M", "2019-580", "Australian Open", "20190114", "R128", "Rafael Nadal", "James Duckworth", None, "N"),
+		("atp", "M", "2019-580", "Australian Open", "20190114", "R64", "Rafael Nadal", "Matthew Ebden", "6-3 6-2 6-2", "N"),
+		("slam_pbp", "M", "ausopen", "ausopen", "2019", "1", "Rafael Nadal", "James Duckworth", "6-4 6-3 7-5", None),
+		("slam_pbp", "M", "ausopen", "ausopen", "2018", "1", "Rafael Nadal", "James Duckworth", "6-1 6-1 6-1", None),
+	)
+	out = dedup_matches(df)
+	assert out["source"].tolist() == ["atp", "atp", "slam_pbp"]
+	assert out.loc[0, "score"] == "6-4 6-3 7-5"
+	assert out.loc[0, "has_points"] == "Y"
+	assert out.loc[0, "tourney_id"] == "2019-580"
+	# the previous year's meeting is outside the window and stays its own row
+	assert out.loc[2, "tourney_date"] == "2018"
+
+
+def test_survivor_takes_one_row_per_source():
+	df = _matches(
+		("atp", "M", "2019-580", "Australian Open", "20190114", "R128", "A Player", "B Player", None, None),
+		("slam_pbp", "M", "ausopen", "ausopen", "2019", "1", "A Player", "B Player", "6-4 6-4 6-4", None),
+		("slam_pbp", "M", "ausopen", "ausopen", "2019", "1", "A Player", "B Player", "6-1 6-1 6-1", None),
+	)
+	out = dedup_matches(df)
+	assert len(out) == 2
+	assert out.loc[0, "score"] == "6-4 6-4 6-4"
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pandas as pd
+
+from tennis_master.pipeline.deltas import DeltaTracker, row_hashes
+
+
+def _matches(*rows):
+	return pd.DataFrame(list(rows), columns=["match_id", "event_year", "gender", "score"], dtype="string")
+
+
+def _config(out_dir, **scope):
+	return SimpleNamespace(out_dir=out_dir, compression=None, years=scope.get("years"), tours=scope.get("tours"), sources=scope.get("sources"))
+
+
+def _build(config, df, file_years=None):
+	tracker = DeltaTracker(config)
+	tracker.add(df, file_years)
+	return tracker.finish()
+
+
+def _ids(path):
+	return pd.read_csv(path, dtype="string")["match_id"].tolist()
+
+
+def test_row_hashes_follow_content_not_index():
+	a = _matches(("m1", "2020", "M", "6-4 6-4"))
+	b = a.set_axis([7])
+	assert row_hashes(a)[0] == row_hashes(b)[0]
+	assert row_hashes(a)[0] != row_hashes(a.assign(score="6-4 6-3"))[0]
+
+
+def test_first_build_inserts_everything_then_tracks_changes(tmp_path):
+	config = _config(tmp_path)
+	assert _build(config, _matches(("m1", "2020", "M", "6-4"), ("m2", "2020", "M", "6-3"), ("m3", "2021", "W", "6-2"))) == (3, 0, 0)
+	counts = _build(config, _matches(("m1", "2020", "M", "6-4"), ("m2", "2020", "M", "7-5"), ("m4", "2021", "W", "6-0")))
+	assert counts == (1, 1, 1)
+	assert _ids(tmp_path / "tennis_master_matches_inserted.csv") == ["m4"]
+	assert _ids(tmp_path / "tennis_master_matches_updated.csv") == ["m2"]
+	assert _ids(tmp_path / "tennis_master_matches_deleted.csv") == ["m3"]
+	summary = pd.read_csv(tmp_path / "tennis_master_matches_delta_summary.csv")
+	assert summary.set_index("change")["rows"].to_dict() == {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+
+
+def test_scoped_build_keeps_state_outside_its_years(tmp_path):
+	_build(_config(tmp_path), _matches(("m1", "2020", "M", "6-4"), ("m2", "2021", "M", "6-3")))
+	scoped = _config(tmp_path, years=(2021,))
+	(tmp_path / "scoped").mkdir()
+	assert _build(scoped, _matches(("m3", "2021", "M", "6-1"))) == (1, 0, 1)
+	state = pd.read_csv(tmp_path / "scoped" / "tennis_master_matches_state.csv", dtype="string")
+	assert sorted(state["match_id"]) == ["m1", "m3"]
+	# the full build's state is left as it was
+	assert sorted(_ids(tmp_path / "tennis_master_matches_state.csv")) == ["m1", "m2"]
+
+
+def test_scoped_build_scopes_by_file_year(tmp_path):
+	# Brisbane 2020 is dated Dec 31 2019 but lives in the 2020 match file
+	full = _matches(("m1", "2019", "M", "6-4"), ("m2", "2019", "M", "6-3"), ("m3", "2020", "M", "6-2"))
+	_build(_config(tmp_path), full, pd.Series([2019, 2020, 2020]))
+	(tmp_path / "scoped").mkdir()
+	assert _build(_config(tmp_path, years=(2019,)), full.iloc[[0]], pd.Series([2019])) == (0, 0, 0)
+	state = pd.read_csv(tmp_path / "scoped" / "tennis_master_matches_state.csv", dtype="string")
+	assert sorted(state["match_id"]) == ["m1", "m2", "m3"]
+	assert state.set_index("match_id").loc["m2", "file_year"] == "2020"
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from tennis_master.integrations.rankings import RankingWindow, _ranking_table, _read_ranking_file, attach_rankings
+
+
+def _file(rows):
+	"""(keys, rank, points) arrays from (player, yyyymmdd, rank, points) tuples."""
+	player = np.array([r[0] for r in rows], dtype=np.int64)
+	date = np.array([r[1] for r in rows], dtype=np.int64)
+	return (player << 32) | date, np.array([r[2] for r in rows], dtype=np.int32), np.array([r[3] for r in rows], dtype=np.int32)
+
+
+def test_lookup_takes_latest_ranking_on_or_before_date():
+	table = _ranking_table([_file([(100, 20190107, 5, 900), (100, 20190114, 4, 950), (200, 20190107, 1, 5000)])])
+	rank, points = table.lookup(np.array([100, 100, 200, 300]), np.array([20190110, 20190114, 20190301, 20190110]))
+	assert rank.tolist() == [5, 4, 1, -1]
+	assert points.tolist() == [900, 950, 5000, -1]
+
+
+def test_lookup_ignores_rankings_before_first_week_and_stale_ones():
+	table = _ranking_table([_file([(100, 20190107, 5, 900)])])
+	rank, _ = table.lookup(np.array([100, 100]), np.array([20190101, 20191231]))
+	assert rank.tolist() == [-1, -1]
+
+
+def test_lookup_skips_invalid_dates():
+	table = _ranking_table([_file([(100, 20190107, 5, 900)])])
+	rank, points = table.lookup(np.array([100, 100]), np.array([20190230, 0]))
+	assert rank.tolist() == [-1, -1]
+	assert points.tolist() == [-1, -1]
+
+
+def test_later_file_wins_overlapping_week():
+	table = _ranking_table([_file([(100, 20190107, 5, 900)]), _file([(100, 20190107, 6, 880)])])
+	rank, points = table.lookup(np.array([100]), np.array([20190108]))
+	assert (rank[0], points[0]) == (6, 880)
+
+
+def test_attach_rankings_fills_only_missing_ranks():
+	matches = pd.DataFrame({
+		"gender": ["M", "M", "W"],
+		"tourney_date": ["20190110", "20190110", "20190110"],
+		"winner_id": ["100", "100", "100"],
+		"loser_id": ["200", "200", "200"],
+		"winner_rank": [pd.NA, "7", pd.NA],
+		"loser_rank": [pd.NA, pd.NA, pd.NA],
+	}, dtype="string")
+	rankings = {"atp": _ranking_table([_file([(100, 20190107, 5, 900), (200, 20190107, 1, 5000)])])}
+	out = attach_rankings(matches, rankings)
+	assert out["winner_rank"].tolist() == ["5", "7", pd.NA]
+	assert out["loser_rank"].tolist() == ["1", "1", pd.NA]
+	assert out["winner_rank_points"].tolist() == ["900", pd.NA, pd.NA]
+
+
+def _write_rankings(path, rows, extra=b""):
+	lines = [b"ranking_date,rank,player,points,note"] + [f"{d},{r},{p},{pts},x".encode() + extra for d, r, p, pts in rows]
+	path.write_bytes(b"\n".join(lines) + b"\n")
+
+
+def test_read_ranking_file_falls_back_to_latin1(tmp_path):
+	path = tmp_path / "atp_rankings_10s.csv"
+	_write_rankings(path, [(20190107, 5, 100, 900)], extra=b"\xe9")
+	keys, rank, points = _read_ranking_file(path)
+	assert rank.tolist() == [5] and points.tolist() == [900]
+	assert int(keys[0] & 0xFFFFFFFF) == 20190107
+
+
+def test_ranking_window_holds_only_files_around_the_partition(tmp_path):
+	atp = tmp_path / "tennis_atp"
+	atp.mkdir()
+	_write_rankings(atp / "atp_rankings_00s.csv", [(20090105, 9, 100, 100)])
+	_write_rankings(atp / "atp_rankings_10s.csv", [(20100104, 3, 100, 300)])
+	_write_rankings(atp / "atp_rankings_20s.csv", [(20200106, 1, 100, 900)])
+	config = SimpleNamespace(data_root=tmp_path, tours=frozenset({"atp"}), years=None, sources=None)
+	window = RankingWindow(config)
+	tables = window.tables([2010])
+	assert sorted(p.name for p in window._cache) == ["atp_rankings_00s.csv", "atp_rankings_10s.csv"]
+	assert tables["atp"].lookup(np.array([100]), np.array([20100110]))[0].tolist() == [3]
+	window.tables([2015])
+	assert sorted(p.name for p in window._cache) == ["atp_rankings_10s.csv"]
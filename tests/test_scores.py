@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from tennis_master.integrations.scores import SCORE_COLUMNS, parse_scores
+
+
+def _parse(*scores):
+	return parse_scores(pd.DataFrame({"score": pd.array(list(scores), dtype="string")}))
+
+
+def test_sets_games_and_short_tiebreak():
+	row = _parse("6-4 3-6 7-6(5)").iloc[0]
+	assert (row["set1_w"], row["set1_l"], row["set2_w"], row["set2_l"]) == (6, 4, 3, 6)
+	assert (row["set3_tb_w"], row["set3_tb_l"]) == (7, 5)
+	assert (row["sets_w"], row["sets_l"]) == (2, 1)
+	assert (row["games_w"], row["games_l"], row["total_games"]) == (16, 16, 32)
+	assert pd.isna(row["set4_w"]) and pd.isna(row["set1_tb_w"])
+
+
+def test_long_tiebreak_and_match_tiebreak():
+	row = _parse("6-7(7-9) 6-4 [10-8]").iloc[0]
+	assert (row["set1_tb_w"], row["set1_tb_l"]) == (7, 9)
+	# a match tiebreak is a 1-0 set with its points in the tiebreak columns
+	assert (row["set3_w"], row["set3_l"], row["set3_tb_w"], row["set3_tb_l"]) == (1, 0, 10, 8)
+	assert (row["sets_w"], row["sets_l"]) == (2, 1)
+	assert (row["games_w"], row["games_l"]) == (13, 11)
+
+
+def test_extended_tiebreak_short_form():
+	row = _parse("7-6(12)").iloc[0]
+	assert (row["set1_tb_w"], row["set1_tb_l"]) == (14, 12)
+
+
+def test_retirement_does_not_count_unfinished_set():
+	row = _parse("6-3 2-1 RET").iloc[0]
+	assert (row["set2_w"], row["set2_l"]) == (2, 1)
+	assert (row["sets_w"], row["sets_l"]) == (1, 0)
+	assert row["is_retirement"] and not row["is_walkover"] and not row["is_default"]
+
+
+def test_walkover_and_missing_scores_have_no_sets():
+	out = _parse("W/O", None, "6-2 6-2 DEF")
+	assert pd.isna(out.loc[0, "set1_w"]) and pd.isna(out.loc[0, "sets_w"])
+	assert bool(out.loc[0, "is_walkover"])
+	assert pd.isna(out.loc[1, "games_w"]) and not out.loc[1, "is_retirement"]
+	assert bool(out.loc[2, "is_default"]) and out.loc[2, "sets_w"] == 2
+
+
+def test_repeated_scores_keep_row_alignment():
+	out = parse_scores(pd.DataFrame({"score": ["6-1 6-1", "6-4 6-4", "6-1 6-1"]}, index=[10, 20, 30]))
+	assert list(out.index) == [10, 20, 30]
+	assert out["games_l"].tolist() == [2, 8, 2]
+	assert set(SCORE_COLUMNS) <= set(out.columns)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from tennis_master.serving.server import QueryHandler, ServedTables, TableStore
+
+
+def _write_matches(out_dir):
+	(out_dir / "tennis_master_matches.csv").write_text(
+		"match_id,tourney_id,event_year,winner_id,loser_id\n"
+		"m1,2019-580,2019,100,200\n"
+		"m2,2019-580,,100,300\n"
+		"m3,2020-580,2020,300,100\n"
+	)
+
+
+def test_years_stay_text_when_some_are_blank(tmp_path):
+	_write_matches(tmp_path)
+	tables = ServedTables.load(tmp_path)
+	assert tables.query_matches(year="2019").tolist() == [0]
+	assert tables.query_matches(player="100", year="2020").tolist() == [2]
+	assert tables.query_matches(player="100", opponent="300").tolist() == [1, 2]
+
+
+@pytest.fixture
+def base_url(tmp_path):
+	_write_matches(tmp_path)
+	handler = type("BoundQueryHandler", (QueryHandler,), {"store": TableStore(tmp_path)})
+	server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield f"http://127.0.0.1:{server.server_address[1]}"
+	server.shutdown()
+	server.server_close()
+
+
+def test_matches_pages_results(base_url):
+	with urlopen(f"{base_url}/matches?player=100&limit=1&offset=1") as response:
+		body = json.load(response)
+	assert body["total"] == 3
+	assert [m["match_id"] for m in body["matches"]] == ["m2"]
+
+
+@pytest.mark.parametrize("query", ["limit=-1", "offset=-2", "limit=x"])
+def test_bad_paging_is_a_400(base_url, query):
+	with pytest.raises(HTTPError) as err:
+		urlopen(f"{base_url}/matches?{query}")
+	assert err.value.code == 400
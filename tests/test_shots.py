@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from tennis_master.integrations.shots import tokenize_points
+
+
+def _points(*rows):
+	return pd.DataFrame(list(rows), columns=["match_id", "Pt", "Svr", "Ret", "1st", "2nd"], dtype="string")
+
+
+def test_rally_shots_alternate_players_and_keep_the_outcome():
+	out = tokenize_points(_points(("m1", "1", "1", "2", "6f28b3*", None)))
+	assert out["shot_no"].tolist() == [1, 2, 3]
+	assert out["player"].tolist() == [1, 2, 1]
+	assert out["shot_type"].astype(str).tolist() == ["serve", "forehand", "backhand"]
+	assert out["serve_location"].astype(str).tolist()[0] == "T"
+	assert out["direction"].astype(str).tolist()[1:] == ["middle", "backhand_side"]
+	assert out["depth"].astype(str).tolist()[1] == "mid_court"
+	assert out["outcome"].astype(str).tolist() == ["in", "in", "winner"]
+	assert out["unparsed"].isna().all()
+
+
+def test_second_serve_follows_a_fault_only():
+	out = tokenize_points(_points(("m1", "2", "1", "2", "4n", "5*"), ("m1", "3", "1", "2", "4*", "6n")))
+	assert out["serve_no"].tolist() == [1, 2, 1]
+	assert out["outcome"].astype(str).tolist() == ["fault", "ace", "ace"]
+	assert out["error_type"].astype(str).tolist()[0] == "net"
+
+
+def test_direction_zero_is_unknown():
+	out = tokenize_points(_points(("m1", "1", "1", "2", "6f0b1@", None)))
+	assert out["direction"].astype(str).tolist()[1:] == ["unknown", "forehand_side"]
+	assert out["outcome"].astype(str).tolist()[-1] == "unforced_error"
+
+
+def test_unrecognized_characters_are_flagged_on_the_serve_row():
+	out = tokenize_points(_points(("m1", "1", "1", "2", "6fC1b3*", None)))
+	assert out["shot_type"].astype(str).tolist() == ["serve", "forehand", "backhand"]
+	assert out["unparsed"].tolist()[0] == "C1"
+	assert out["unparsed"].iloc[1:].isna().all()
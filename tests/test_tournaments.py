@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from tennis_master.dimensions.tournaments import TournamentIndex, canonical_tourney_ids
+from tennis_master.utils import tourney_tokens
+
+
+def _index():
+	return TournamentIndex.from_dimension(pd.DataFrame({
+		"tourney_id": ["2019-580", "2019-M-ITF-TUN-01A-2019", "2019-M-ITF-TUN-05A-2019"],
+		"tourney_name": ["Australian Open", "M15 Monastir", "M15 Monastir"],
+		"surface": ["Hard", "Hard", "Hard"],
+		"tourney_level": ["G", "15", "15"],
+		"draw_size": ["128", "32", "32"],
+		"tourney_date": ["20190114", "20190107", "20190204"],
+		"gender": ["M", "M", "M"],
+	}))
+
+
+def test_tourney_tokens_fold_slam_slugs():
+	names = pd.Series(["ausopen", "Australian Open", "Roland Garros", "frenchopen", None])
+	assert tourney_tokens(names).tolist() == ["australianopen", "australianopen", "rolandgarros", "rolandgarros", ""]
+
+
+def test_slam_rows_take_the_tour_id_and_its_start_date():
+	matches = pd.DataFrame({
+		"tourney_id": ["ausopen", "ausopen", "2019-580"],
+		"tourney_name": ["ausopen", "ausopen", "Australian Open"],
+		"tourney_date": ["2019", "2018", "20190114"],
+		"surface": [pd.NA, pd.NA, "Hard"],
+		"tourney_level": [pd.NA, pd.NA, "G"],
+		"gender": ["M", "M", "M"],
+	}, dtype="string")
+	out = canonical_tourney_ids(matches, _index())
+	assert out["tourney_id"].tolist() == ["2019-580", "ausopen", "2019-580"]
+	# the Slam file's year-only date is replaced by the tournament's start date
+	assert out["tourney_date"].tolist() == ["20190114", "2018", "20190114"]
+	assert out.loc[0, "surface"] == "Hard" and out.loc[0, "draw_size"] == "128"
+	assert pd.isna(out.loc[1, "surface"])
+
+
+def test_weekly_events_resolve_to_the_nearest_start():
+	matches = pd.DataFrame({
+		"tourney_id": [pd.NA, pd.NA],
+		"tourney_name": ["M15 Monastir", "M15 Monastir"],
+		"tourney_date": ["20190108", "20190205"],
+		"gender": ["M", "M"],
+	}, dtype="string")
+	out = canonical_tourney_ids(matches, _index())
+	assert out["tourney_id"].tolist() == ["2019-M-ITF-TUN-01A-2019", "2019-M-ITF-TUN-05A-2019"]
+	# full dates from the source are kept
+	assert out["tourney_date"].tolist() == ["20190108", "20190205"]
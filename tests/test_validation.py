@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from tennis_master.staging.validation import ValidationError, ValidationReport, validate_matches
+
+
+def _row(**fields):
+	row = {
+		"source": "atp", "tourney_id": "2019-580", "tourney_date": "20190114", "tourney_level": "G",
+		"match_num": "1", "winner_id": "100", "loser_id": "200",
+		"w_svpt": "80", "w_1stIn": "50", "w_1stWon": "40", "w_2ndWon": "20", "w_ace": "10",
+		"w_bpSaved": "2", "w_bpFaced": "3",
+	}
+	row.update(fields)
+	return row
+
+
+def _rules(*rows):
+	return validate_matches(pd.DataFrame(list(rows), dtype="string"))
+
+
+def test_clean_row_has_no_violations():
+	assert _rules(_row()).empty
+
+
+def test_row_rules_report_offending_values():
+	found = _rules(
+		_row(tourney_date="2019"),
+		_row(loser_id="100"),
+		_row(loser_id=None),
+		_row(tourney_level="Z"),
+		_row(w_ace="ten"),
+	)
+	assert found["rule"].tolist() == [
+		"tourney_date_not_yyyymmdd", "winner_is_loser", "missing_player_id", "unknown_tourney_level", "non_numeric_stat",
+	]
+	assert found["row"].tolist() == [0, 1, 2, 3, 4]
+	assert found.loc[1, "value"] == "100|100"
+	assert found.loc[3, "value"] == "Z"
+
+
+def test_impossible_stats_are_warnings():
+	found = _rules(_row(w_1stIn="90"), _row(w_bpSaved="4"), _row(w_2ndWon="31"), _row(w_ace="-1"))
+	assert found["rule"].eq("impossible_stat").all()
+	assert found["severity"].eq("warning").all()
+	assert found["row"].tolist() == [0, 1, 2, 3]
+
+
+def test_levels_follow_the_source():
+	found = _rules(_row(source="atp_futures", tourney_level="15"), _row(source="wta", tourney_level="P"), _row(source="wta", tourney_level="M"))
+	assert found["row"].tolist() == [2]
+
+
+def test_rules_only_apply_to_tour_sources():
+	assert _rules(_row(source="slam_pbp", tourney_date="2019", winner_id=None)).empty
+
+
+def test_strict_report_raises_on_errors_only(tmp_path):
+	config = SimpleNamespace(out_dir=tmp_path, strict_validation=True)
+	report = ValidationReport(config)
+	report.check(pd.DataFrame([_row(w_ace="-1")], dtype="string"))
+	with pytest.raises(ValidationError, match="atp/winner_is_loser: 1"):
+		report.check(pd.DataFrame([_row(loser_id="100")], dtype="string"))
+	written = pd.read_csv(tmp_path / "validation_violations.csv", dtype="string")
+	assert written["rule"].tolist() == ["impossible_stat", "winner_is_loser"]
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from tennis_master.utils import PartitionedCsvWriter, write_csv
+
+
+def test_partitions_append_under_one_header(tmp_path):
+	writer = PartitionedCsvWriter(tmp_path / "t.csv", "gzip")
+	assert not writer.started
+	writer.write(pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+	writer.write(pd.DataFrame({"a": [3], "b": ["z"]}))
+	assert writer.path.name == "t.csv.gz" and writer.rows == 3 and writer.started
+	assert pd.read_csv(writer.path)["a"].tolist() == [1, 2, 3]
+
+
+def test_writing_removes_other_compression_variants(tmp_path):
+	df = pd.DataFrame({"a": [1]})
+	write_csv(df, tmp_path / "t.csv")
+	written = write_csv(df, tmp_path / "t.csv", "gzip")
+	assert sorted(p.name for p in tmp_path.iterdir()) == ["t.csv.gz"]
+	write_csv(df, tmp_path / "t.csv")
+	assert not written.exists() and (tmp_path / "t.csv").exists()